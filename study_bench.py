@@ -0,0 +1,197 @@
+"""모두의 스터디 성능 측정 (화면 없이 offscreen Qt 로 실행).
+
+가상의 study_subjects 폴더(한글 문항, 시험 기록, 오답 회차, 예전 txt 오답 노트)를 만든 뒤
+화면의 주요 경로를 실제 메서드 그대로 여러 번 실행해 지연 시간 백분위와 최대 메모리를 JSON 으로 남긴다.
+
+예) python study_bench.py --subjects 20 --questions 50000 --repeat 10 --out bench.json
+    python study_bench.py --compare bench_old.json --out bench_new.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from study_core import QuestionStore, StatsLog, WrongNoteDB, NOTE_PREFIX, format_wrong_note
+
+WORDS = ("사과", "바다", "하늘", "역사", "조선", "세종", "한글", "경제", "물리", "화학", "민법", "형법", "헌법", "회계", "원가",
+         "전기", "회로", "기계", "설계", "토목", "건축", "간호", "약리", "영양", "위생", "정보", "보안", "통신", "네트워크", "운영체제")
+
+# --- 가상 데이터 만들기 ---
+def korean_text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def make_subject(folder, rng, questions, sessions, legacy_notes, start):
+    os.makedirs(folder, exist_ok=True)
+    items = [{"question": f"{korean_text(rng, 4)}의 정의는 무엇인가? ({i})", "answer": korean_text(rng, 2)} for i in range(questions)]
+    store = QuestionStore(folder); store.load(); store.compact(items)
+    records, db = [], WrongNoteDB(folder)
+    for s in range(sessions):
+        when = start + timedelta(hours=s)
+        total = min(20, questions); wrong = [{"q": it['question'], "user": korean_text(rng, 1), "correct": it['answer']}
+                                             for it in rng.sample(items, rng.randint(0, total))]
+        score = total - len(wrong); percent = round(score / total * 100, 1) if total else 0.0
+        records.append({"date": when.strftime("%Y-%m-%d %H:%M"), "score": score, "total": total, "percent": percent})
+        note_name = f"{NOTE_PREFIX}{when.strftime('%Y%m%d_%H%M%S')}.txt"
+        if wrong:
+            db.record_session(when.strftime('%Y-%m-%d %H:%M:%S'), score, total, percent, wrong, note_name)
+            with open(os.path.join(folder, note_name), "w", encoding="utf-8") as f: f.write(format_wrong_note(when.strftime('%Y-%m-%d %H:%M:%S'), score, total, percent, wrong))
+    db.close()
+    StatsLog(folder).extend(records)
+    # DB 가 생기기 전의 txt 오답 노트. 오답 노트 창을 처음 열 때 가져온다.
+    for n in range(legacy_notes):
+        when = start - timedelta(days=n + 1)
+        wrong = [{"q": it['question'], "user": "(미입력)", "correct": it['answer']} for it in rng.sample(items, min(10, questions))]
+        with open(os.path.join(folder, f"{NOTE_PREFIX}{when.strftime('%Y%m%d_%H%M%S')}.txt"), "w", encoding="utf-8") as f:
+            f.write(format_wrong_note(when.strftime('%Y-%m-%d %H:%M:%S'), 0, len(wrong), 0.0, wrong))
+
+def generate_tree(base_dir, subjects, questions, sessions, legacy_notes, seed=1):
+    rng, start = random.Random(seed), datetime(2026, 1, 1, 9, 0)
+    names = [f"과목_{i:03d}" for i in range(subjects)]
+    for name in names: make_subject(os.path.join(base_dir, name), rng, questions, sessions, legacy_notes, start)
+    return names
+
+# --- 측정 ---
+def percentile(sorted_ms, p):
+    if not sorted_ms: return None
+    k = (len(sorted_ms) - 1) * p / 100
+    lo = int(k); hi = min(lo + 1, len(sorted_ms) - 1)
+    return round(sorted_ms[lo] + (sorted_ms[hi] - sorted_ms[lo]) * (k - lo), 3)
+
+def summarize(times, peak):
+    ms = sorted(t * 1000 for t in times)
+    return {"runs": len(ms), "first_ms": round(times[0] * 1000, 3), "mean_ms": round(sum(ms) / len(ms), 3),
+            "p50_ms": percentile(ms, 50), "p90_ms": percentile(ms, 90), "p99_ms": percentile(ms, 99), "max_ms": round(ms[-1], 3),
+            "peak_kb": peak}
+
+def max_rss_kb():
+    try: import resource
+    except ImportError: return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def run_benchmarks(base_dir, names, repeat, work_dir):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import system
+    from system import QApplication, QMessageBox, QFileDialog, WrongNoteDialog, wait_io
+    app = QApplication.instance() or QApplication([])
+    QMessageBox.information = staticmethod(lambda *a, **k: None)
+    QMessageBox.warning = staticmethod(lambda *a, **k: print("경고:", *a[2:3], file=sys.stderr))
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.StandardButton.Yes)
+
+    def settle(until=None):
+        # 입출력 큐가 비고, 완료 신호까지 모두 전달될 때까지 이벤트를 돌린다.
+        while True:
+            wait_io(); app.processEvents()
+            if not system._io_tasks and (until is None or until()): return
+
+    w = system.StudyMasterPyQt(base_dir); w.show(); settle()  # 보이는 창이어야 목록 갱신에 그리기 비용이 포함된다
+    name = names[0]; subject_path = os.path.join(base_dir, name)
+    zip_path = os.path.join(work_dir, f"{name}.zip")
+    QFileDialog.getSaveFileName = staticmethod(lambda *a, **k: (zip_path, ""))
+    QFileDialog.getOpenFileName = staticmethod(lambda *a, **k: (zip_path, ""))
+    counter = [0]
+
+    def op_load():
+        w.load_subject_data(name); settle(lambda: not w.loading)
+
+    def op_save_bank():
+        # 중복 색인을 만드는 동안(loading)에는 등록이 미뤄져 저널에 닿지 않으므로, 색인을 먼저 만들어 두고
+        # 등록 한 건이 저널(또는 압축된 스냅샷)에 실제로 기록될 때까지를 잰다.
+        settle(lambda: not w.loading)
+        if w.dups is None: w.build_dups(); settle(lambda: not w.loading)
+        counter[0] += 1; before = w.store.signature()
+        w.ent_q.setText(f"벤치마크 추가 문항 {counter[0]} {time.time_ns()}"); w.ent_a.setText("정답")
+        t = time.perf_counter(); w.add_question(); wait_io(subject_path); elapsed = time.perf_counter() - t
+        if w.store.signature() == before: raise RuntimeError("save_bank: 문항이 저널에 기록되지 않았습니다")
+        settle()
+        return elapsed
+
+    def op_update_list_view():
+        w.update_list_view(); app.processEvents()
+
+    def op_show_result():
+        w.spin_count.setValue(min(20, len(w.question_bank))); w.start_exam(); ex = w.ex
+        while not ex.exam.finished(): ex.exam.check("오답"); ex.exam.advance()
+        t = time.perf_counter(); ex.show_result(); wait_io(subject_path); elapsed = time.perf_counter() - t
+        ex.close(); settle()
+        return elapsed
+
+    def op_show_statistics():
+        w.show_statistics(); settle()
+
+    def op_wrong_note_dialog():
+        dlg = WrongNoteDialog(name, subject_path, w)
+        settle(lambda: dlg.db is not None)
+        if dlg.session_model.rowCount(): dlg.display_note_content(dlg.session_model.index(0))
+        app.processEvents(); dlg.done(0)
+
+    def op_export():
+        w.export_subject(); settle()
+
+    def op_import():
+        w.import_subject(); settle()
+
+    ops = [("load_subject_data", op_load), ("save_bank", op_save_bank), ("update_list_view", op_update_list_view),
+           ("show_result", op_show_result), ("show_statistics", op_show_statistics), ("WrongNoteDialog", op_wrong_note_dialog),
+           ("export_subject", op_export), ("import_subject", op_import)]
+    op_load()
+    results = {}
+    for label, fn in ops:
+        times = []
+        for _ in range(repeat):
+            t = time.perf_counter(); inner = fn(); elapsed = time.perf_counter() - t
+            times.append(inner if inner is not None else elapsed)
+        # 메모리는 따로 한 번 더 재서 시간 측정에 tracemalloc 부담이 섞이지 않게 한다.
+        tracemalloc.start(); fn(); peak = tracemalloc.get_traced_memory()[1] // 1024; tracemalloc.stop()
+        results[label] = summarize(times, peak)
+        print(f"{label:20s} p50 {results[label]['p50_ms']:>10.2f} ms  p90 {results[label]['p90_ms']:>10.2f} ms  peak {peak:>8d} KB", file=sys.stderr)
+    w.close(); settle()
+    return results
+
+def compare(report, old_path):
+    with open(old_path, encoding="utf-8") as f: old = json.load(f)
+    print(f"\n{old_path} 대비 (p50, 1.00 보다 크면 느려짐)")
+    for label, res in report["results"].items():
+        prev = old.get("results", {}).get(label)
+        if not prev or not prev["p50_ms"]: print(f"  {label:20s} (이전 기록 없음)"); continue
+        print(f"  {label:20s} {res['p50_ms'] / prev['p50_ms']:6.2f}x  ({prev['p50_ms']} -> {res['p50_ms']} ms)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="study_bench", description="모두의 스터디 성능 측정")
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=20000, help="과목당 문항 수")
+    parser.add_argument("--sessions", type=int, default=200, help="과목당 시험 기록(오답 회차) 수")
+    parser.add_argument("--legacy-notes", type=int, default=20, help="과목당 예전 txt 오답 노트 수")
+    parser.add_argument("--repeat", type=int, default=5, help="경로별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench_report.json")
+    parser.add_argument("--compare", help="이전 보고서와 p50 비교")
+    parser.add_argument("--keep", action="store_true", help="만든 가상 데이터 폴더를 지우지 않는다")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="study_bench_")
+    base_dir = os.path.join(work_dir, "study_subjects"); os.makedirs(base_dir)
+    try:
+        t = time.perf_counter()
+        names = generate_tree(base_dir, args.subjects, args.questions, args.sessions, args.legacy_notes, args.seed)
+        generate_s = round(time.perf_counter() - t, 3)
+        print(f"가상 데이터 생성 {generate_s}s ({base_dir})", file=sys.stderr)
+        results = run_benchmarks(base_dir, names, args.repeat, work_dir)
+    finally:
+        if not args.keep: shutil.rmtree(work_dir, ignore_errors=True)
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(), "platform": platform.platform(),
+              "params": {k: getattr(args, k) for k in ("subjects", "questions", "sessions", "legacy_notes", "repeat", "seed")},
+              "generate_s": generate_s, "max_rss_kb": max_rss_kb(), "results": results}
+    with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"보고서: {args.out}", file=sys.stderr)
+    if args.compare: compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
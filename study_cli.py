@@ -0,0 +1,130 @@
+"""모두의 스터디 명령줄 도구 (Qt 없이 동작).
+
+예) python study_cli.py list
+    python study_cli.py add 영어 "apple" "사과"
+    python study_cli.py bulk 영어 words.csv
+    python study_cli.py exam 영어 -n 20 --weighted
+"""
+import os
+import sys
+import argparse
+
+from study_core import (NullTask, QuestionStore, StatsLog, SearchIndex, DuplicateIndex, Exam, default_base_dir, folder_lock,
+                        list_subjects, add_question, load_review_sampler)
+
+class PrintTask(NullTask):
+    # 화면의 진행 창 대신 표준 오류에 진행 상황을 한 줄로 덮어 쓴다.
+    def emit_chunk(self, chunk):
+        done, total, label = chunk
+        print(f"\r[{done}/{total}] {label}"[:100].ljust(100), end="", file=sys.stderr, flush=True)
+
+def positive_int(text):
+    try: value = int(text)
+    except ValueError: value = 0
+    if value < 1: raise argparse.ArgumentTypeError(f"1 이상의 정수여야 합니다: {text}")
+    return value
+
+def subject_folder(args):
+    path = os.path.join(args.base, args.subject)
+    if not os.path.isdir(path): sys.exit(f"과목이 없습니다: {args.subject}")
+    return path
+
+def cmd_list(args):
+    for name in list_subjects(args.base): print(name)
+
+def cmd_add(args):
+    path = os.path.join(args.base, args.subject)
+    os.makedirs(path, exist_ok=True)
+    if not add_question(path, args.question, args.answer): sys.exit("비어 있거나 이미 등록된 문항입니다.")
+
+def cmd_bulk(args):
+    from study_core import bulk_import_questions
+    path = subject_folder(args)
+    with folder_lock(path):
+        store = QuestionStore(path); bank = store.load()
+        index = SearchIndex(path); ids = index.sync(bank, store.signature())
+        res = bulk_import_questions(PrintTask(), args.file, store, bank, DuplicateIndex(bank), index, (ids[-1] if ids else 0) + 1, args.base)
+        index.close()
+    print(file=sys.stderr)
+    print(f"{res['rows']}행 중 {len(res['added'])}개 추가, 중복 {res['duplicates']}개, 오류 {res['error_count']}건")
+    if res["report"]: print(f"오류 보고서: {res['report']}")
+
+def cmd_export(args):
+    from study_core import export_subject_zip
+    export_subject_zip(PrintTask(), subject_folder(args), args.file, reuse=not args.no_reuse)
+    print(file=sys.stderr)
+
+def cmd_import(args):
+    import shutil
+    from study_core import stage_import_zip, merge_subject
+    staging, subjects = stage_import_zip(PrintTask(), args.file)
+    print(file=sys.stderr)
+    try:
+        for name in subjects: merge_subject(os.path.join(staging, name), os.path.join(args.base, name))
+    finally: shutil.rmtree(staging, ignore_errors=True)
+    print(f"과목을 불러왔습니다: {', '.join(subjects)}")
+
+def cmd_exam(args):
+    path = subject_folder(args)
+    bank = QuestionStore(path).load()
+    if not bank: sys.exit("문항이 없습니다.")
+    if args.count > len(bank): print(f"문항이 {len(bank)}개뿐이라 {len(bank)}문항으로 시험을 봅니다.", file=sys.stderr)
+    exam = Exam(bank, min(args.count, len(bank)), load_review_sampler(path, bank) if args.weighted else None)
+    while not exam.finished():
+        print(f"Q{exam.idx + 1}/{len(exam.data)}: {exam.current()['question']}")
+        line = sys.stdin.readline()
+        if not line: exam.stop(); break
+        ok, correct_ans = exam.check(line)
+        print("정답입니다." if ok else f"오답! 정답: {correct_ans}")
+        exam.advance()
+    exam.record(path)
+    print(f"{exam.score} / {len(exam.data)} (최종 성취도: {exam.percent()}%)")
+
+def cmd_stats(args):
+    log = StatsLog(subject_folder(args)); rollup = log.rollup()
+    if not rollup['count']: print("기록이 없습니다."); return
+    # 요약에는 최근 StatsLog.RECENT 회만 있으므로, 그보다 많이 보려면 로그 끝에서 읽는다.
+    recent = rollup['recent'] if args.count is None else log.tail(args.count)
+    for s in recent: print(f"[{s['date']}] {s['score']}/{s['total']} ({s['percent']}%)")
+    print(f"총 {rollup['count']}회 | 평균 {round(rollup['sum'] / rollup['count'], 1)}% | 최고 {rollup['best']}% | 추세(EMA) {rollup['ema']}%")
+
+def cmd_search(args):
+    from study_core import search_all_subjects
+    for name, q, a in search_all_subjects(args.base, args.text, args.limit): print(f"[{name}] Q: {q} | A: {a}")
+
+def cmd_dupes(args):
+    from study_core import save_near_duplicate_report
+    groups, path = save_near_duplicate_report(PrintTask(), args.base)
+    print(file=sys.stderr)
+    print(f"{len(groups)}개 묶음을 찾았습니다.\n{path}" if groups else "비슷한 문항이 없습니다.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="study_cli", description="모두의 스터디 명령줄 도구")
+    parser.add_argument("--base", default=default_base_dir(), help="과목 폴더 위치 (기본: study_subjects)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="과목 목록").set_defaults(func=cmd_list)
+    p = sub.add_parser("add", help="문항 한 개 등록 (과목이 없으면 만든다)")
+    p.add_argument("subject"); p.add_argument("question"); p.add_argument("answer"); p.set_defaults(func=cmd_add)
+    p = sub.add_parser("bulk", help="CSV/TSV/JSONL 문항 일괄 가져오기")
+    p.add_argument("subject"); p.add_argument("file"); p.set_defaults(func=cmd_bulk)
+    p = sub.add_parser("export", help="과목 내보내기 (.zip)")
+    p.add_argument("subject"); p.add_argument("file")
+    p.add_argument("--no-reuse", action="store_true", help="기존 백업의 압축 데이터를 재사용하지 않는다")
+    p.set_defaults(func=cmd_export)
+    p = sub.add_parser("import", help="과목 가져오기 (.zip)")
+    p.add_argument("file"); p.set_defaults(func=cmd_import)
+    p = sub.add_parser("exam", help="표준 입력으로 답하는 시험")
+    p.add_argument("subject"); p.add_argument("-n", "--count", type=positive_int, default=10)
+    p.add_argument("--weighted", action="store_true", help="오답·복습 예정 문항 우선 출제")
+    p.set_defaults(func=cmd_exam)
+    p = sub.add_parser("stats", help="최근 통계")
+    p.add_argument("subject"); p.add_argument("-n", "--count", type=positive_int, help="보여 줄 최근 기록 수 (기본: 10)")
+    p.set_defaults(func=cmd_stats)
+    p = sub.add_parser("search", help="전체 과목에서 문항 검색")
+    p.add_argument("text"); p.add_argument("--limit", type=int, default=1000); p.set_defaults(func=cmd_search)
+    sub.add_parser("dupes", help="유사 문항 보고서 저장").set_defaults(func=cmd_dupes)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
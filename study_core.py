@@ -0,0 +1,1327 @@
+"""모두의 스터디 핵심 기능 (Qt 없이 동작).
+
+과목 폴더, 문항 저장소, 시험 채점과 기록, 통계, 오답 DB, 검색/중복 색인, 백업과 일괄 가져오기를 담는다.
+화면(system.py)과 명령줄(study_cli.py)이 이 모듈을 함께 쓴다.
+"""
+import os
+import sys
+import json
+import random
+import threading
+import zlib
+import heapq
+import time
+import functools
+from array import array
+from collections import Counter
+from collections.abc import MutableSequence
+from datetime import datetime
+
+# 자주 쓰지 않는 표준 모듈(sqlite3, zipfile, csv, hashlib ...)은 쓰는 함수 안에서 불러온다.
+# 명령줄 도구가 목록 조회처럼 가벼운 일만 할 때 시작 시간을 줄이기 위해서다.
+
+def default_base_dir():
+    if getattr(sys, 'frozen', False): return os.path.join(os.path.dirname(sys.executable), "study_subjects")
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "study_subjects")
+
+class NullTask:
+    # 진행 알림과 취소를 받는 작업 객체의 기본형. 화면에서는 IOTask 가, 명령줄에서는 이것이 쓰인다.
+    cancelled = False
+
+    def emit_chunk(self, data): pass
+
+# --- 성능 추적 (Chrome trace-event 형식, 기본은 꺼짐) ---
+# STUDY_TRACE=1 (기본 위치) 또는 STUDY_TRACE=경로.json 으로 켜거나, 화면의 진단 메뉴에서 켠다.
+# 구간마다 걸린 시간, 스레드, 처리한 문항 수(items), 그 사이 늘어난 할당 블록 수(blocks)를 남긴다.
+# 파일은 chrome://tracing 이나 Perfetto 에서 연다. 닫는 ] 가 없어도 읽히므로 줄 단위로 덧붙이고,
+# MAX_BYTES 를 넘으면 이전 파일을 .1 로 돌려 둔다. 꺼져 있을 때는 속성 하나 확인하는 비용뿐이다.
+def diagnostics_dir(): return os.path.join(os.path.dirname(default_base_dir()), "diagnostics")
+
+class _NoSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **args): pass
+
+_NO_SPAN = _NoSpan()
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start", "blocks")
+
+    def __init__(self, tracer, name, args): self.tracer, self.name, self.args = tracer, name, args
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks(); self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.args["blocks"] = sys.getallocatedblocks() - self.blocks  # 프로세스 전체 값이라 다른 스레드 몫이 섞일 수 있다
+        if exc_type is not None: self.args["error"] = exc_type.__name__
+        self.tracer.emit(self.name, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args): self.args.update(args)
+
+class Tracer:
+    MAX_BYTES, FLUSH_EVERY = 50 << 20, 200
+
+    def __init__(self):
+        self.path, self.lock, self.buffer, self.threads = None, threading.Lock(), [], set()
+        self.t0, self.size, self.exit_hook = time.perf_counter_ns(), 0, False
+
+    @property
+    def enabled(self): return self.path is not None
+
+    def enable(self, path=None):
+        with self.lock:
+            if self.path: return self.path
+            path = path or os.path.join(diagnostics_dir(), f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._start_file(path); self.path = path
+        if not self.exit_hook:
+            import atexit
+            atexit.register(self.disable); self.exit_hook = True
+        return path
+
+    def disable(self):
+        with self.lock:
+            if self.path: self._flush()
+            self.path = None
+
+    def span(self, name, **args): return Span(self, name, args) if self.path else _NO_SPAN
+
+    def emit(self, name, start, dur, args):
+        tid = threading.get_ident()
+        with self.lock:
+            if not self.path: return
+            if tid not in self.threads:
+                self.threads.add(tid)
+                self.buffer.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": threading.current_thread().name}})
+            self.buffer.append({"name": name, "cat": name.split(".")[0], "ph": "X", "ts": (start - self.t0) / 1000, "dur": dur / 1000,
+                                "pid": os.getpid(), "tid": tid, "args": args})
+            if len(self.buffer) >= self.FLUSH_EVERY: self._flush()
+
+    def flush(self):
+        with self.lock:
+            if self.path: self._flush()
+
+    def _start_file(self, path):
+        with open(path, 'w', encoding='utf-8') as f: f.write("[\n")
+        self.size, self.threads = 2, set()
+
+    def _flush(self):
+        if not self.buffer: return
+        data = "".join(json.dumps(e, ensure_ascii=False, default=str) + ",\n" for e in self.buffer)
+        self.buffer = []
+        with open(self.path, 'a', encoding='utf-8') as f: f.write(data)
+        self.size += len(data)
+        if self.size > self.MAX_BYTES:
+            root, ext = os.path.splitext(self.path)
+            os.replace(self.path, f"{root}.1{ext}"); self._start_file(self.path)
+
+tracer = Tracer()
+if os.environ.get("STUDY_TRACE"):
+    tracer.enable(None if os.environ["STUDY_TRACE"].lower() in ("1", "true", "on") else os.environ["STUDY_TRACE"])
+
+def save_profile(profiler, folder=None):
+    # cProfile 결과를 .prof(snakeviz 등으로 보기)와 누적 시간순 상위 40개 요약 .txt 로 남긴다.
+    import io, pstats
+    folder = folder or diagnostics_dir(); os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+    profiler.dump_stats(path)
+    out = io.StringIO(); pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+    with open(path[:-len(".prof")] + ".txt", "w", encoding="utf-8") as f: f.write(out.getvalue())
+    return path
+
+def traced(name, items=None):
+    # 저장/색인 함수에 붙인다. items 를 주면 결과에서 처리한 문항 수를 뽑아 함께 남긴다.
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if tracer.path is None: return fn(*args, **kwargs)
+            with tracer.span(name) as sp:
+                res = fn(*args, **kwargs)
+                if items is not None and res is not None: sp.set(items=items(res))
+                return res
+        return inner
+    return wrap
+
+# --- 문항 저장소 (questions.json 스냅샷 + 추가 전용 저널) ---
+# 저널 첫 줄은 기준 스냅샷의 crc32 이며, 스냅샷과 crc 가 맞는 저널만 재생한다.
+# 압축 도중 비정상 종료되어도 questions.journal / questions.journal.next 중 하나가 반드시 맞는다.
+# 추가/삭제/압축은 같은 과목의 입출력 큐(submit_io)에서 순서대로 실행된다고 가정한다.
+_folder_locks = {}
+_folder_locks_guard = threading.Lock()
+
+def folder_lock(path):
+    with _folder_locks_guard: return _folder_locks.setdefault(os.path.abspath(path), threading.RLock())
+
+def write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f: f.write(data); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class QuestionStore:
+    SNAPSHOT, JOURNAL = "questions.json", "questions.journal"
+
+    def __init__(self, folder, compact_every=500, columns_min=20000):
+        self.folder, self.compact_every, self.columns_min = folder, compact_every, columns_min
+        self.snapshot_path = os.path.join(folder, self.SNAPSHOT)
+        self.journal_path = os.path.join(folder, self.JOURNAL)
+        self.columns_path = os.path.join(folder, QuestionColumns.FILE)
+        self.next_path = self.journal_path + ".next"
+        self.lock = folder_lock(folder)
+        self.base_crc, self.pending = 0, 0
+
+    @traced("store.load", items=len)
+    def load(self):
+        with self.lock:
+            columns = QuestionColumns.open(self.columns_path, self.snapshot_path)
+            if columns is not None: bank, self.base_crc = QuestionBank(columns), columns.crc
+            else:
+                raw = b""
+                if os.path.exists(self.snapshot_path):
+                    with open(self.snapshot_path, 'rb') as f: raw = f.read()
+                with tracer.span("store.json_parse", bytes=len(raw)) as sp: bank = json.loads(raw) if raw.strip() else []; sp.set(items=len(bank))
+                self.base_crc = zlib.crc32(raw)
+                if len(bank) >= self.columns_min: self._write_columns(bank, self.base_crc)
+            for path in (self.journal_path, self.next_path):
+                ops = self._read_journal(path)
+                if ops is None: continue
+                if path == self.next_path: os.replace(self.next_path, self.journal_path)
+                for op in ops: self._apply(bank, op)
+                self.pending = len(ops)
+                break
+            else:
+                # 스냅샷이 밖에서 바뀌었다. 맞지 않는 저널은 지우지 않고 .orphaned 로 옮겨 둔다.
+                for path in (self.journal_path, self.next_path):
+                    if not os.path.exists(path): continue
+                    with open(path, 'rb') as f: empty = not f.read().split(b"\n", 1)[-1].strip()
+                    if empty: os.remove(path)  # 머리줄뿐이면 잃을 기록이 없다
+                    else:
+                        os.replace(path, path + ".orphaned")
+                        print(f"경고: questions.json 과 맞지 않는 저널을 {path}.orphaned 로 옮겼습니다.", file=sys.stderr)
+                self.pending = 0
+            return bank
+
+    def signature(self):
+        # 스냅샷과 저널의 [수정 시각, 크기]. 문항이 바뀌면 둘 중 하나는 반드시 달라진다.
+        return SubjectCatalog.signature(self.folder, (self.SNAPSHOT, self.JOURNAL))
+
+    def _read_journal(self, path):
+        if not os.path.exists(path): return None
+        with open(path, 'r', encoding='utf-8') as f: lines = f.read().split("\n")
+        try: header = json.loads(lines[0])
+        except ValueError: return None
+        if header.get("base") != self.base_crc: return None
+        ops = []
+        for line in lines[1:]:
+            if not line.strip(): continue
+            try: ops.append(json.loads(line))
+            except ValueError: continue  # 기록 도중 끊긴 줄. 다음 기록은 새 줄에서 시작하므로 건너뛰면 된다
+        return ops
+
+    @staticmethod
+    def _apply(bank, op):
+        if "add" in op: bank.append(op["add"])
+        elif "del" in op:
+            for first, last in sorted(op["del"], reverse=True): del bank[first:last + 1]
+
+    @traced("store.journal_append")
+    def _append(self, op):
+        line = json.dumps(op, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with self.lock:
+            new = not os.path.exists(self.journal_path)
+            if not new:
+                # 마지막 기록이 도중에 끊겼다면 그 줄에 이어 쓰지 않도록 줄을 먼저 끝낸다.
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell(): f.seek(-1, os.SEEK_END); line = ("" if f.read(1) == b"\n" else "\n") + line
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                if new: f.write(json.dumps({"base": self.base_crc}) + "\n")
+                f.write(line); f.flush(); os.fsync(f.fileno())
+            self.pending += 1
+
+    def log_add(self, item): self._append({"add": item})
+
+    def log_delete(self, ranges): self._append({"del": [list(r) for r in ranges]})
+
+    def needs_compaction(self, size): return self.pending >= max(self.compact_every, size // 2)
+
+    @traced("store.compact")
+    def compact(self, items):
+        # items 는 호출 시점 문항 목록의 복사본. 큐 순서상 그 앞의 저널 기록은 모두 반영되어 있다.
+        with self.lock: offset = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else None
+        items = list(items)
+        with tracer.span("store.json_dump", items=len(items)): data = json.dumps(items, ensure_ascii=False, indent=4).encode('utf-8')
+        crc = zlib.crc32(data)
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, 'wb') as f: f.write(data); f.flush(); os.fsync(f.fileno())
+        with self.lock:
+            tail = b""
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, 'rb') as f:
+                    if offset is None: f.readline()
+                    else: f.seek(offset)
+                    tail = f.read()
+            write_atomic(self.next_path, json.dumps({"base": crc}).encode('utf-8') + b"\n" + tail)
+            os.replace(tmp, self.snapshot_path)
+            os.replace(self.next_path, self.journal_path)
+            self.base_crc, self.pending = crc, tail.count(b"\n")
+            if len(items) >= self.columns_min: self._write_columns(items, crc)
+            elif os.path.exists(self.columns_path):
+                try: os.remove(self.columns_path)
+                except OSError: pass
+
+    def _write_columns(self, items, crc):
+        # 보조 파일이라 실패해도 된다. (Windows 에서는 열려 있는 mmap 파일을 바꿀 수 없다) 다음 읽기는 JSON 으로 한다.
+        try: QuestionColumns.write(self.columns_path, items, crc, self.snapshot_path)
+        except OSError:
+            if os.path.exists(self.columns_path + ".tmp"): os.remove(self.columns_path + ".tmp")
+
+# --- 문항 열 저장 (questions.bin, 큰 과목을 mmap 으로 바로 여는 보조 파일) ---
+# 머리(매직, 스냅샷 crc/크기/수정 시각, 문항 수) 뒤에 오프셋 표(u64 x 2n+1)와 UTF-8 본문이 이어진다.
+# i 번 문항의 문제는 본문[off[2i]:off[2i+1]], 정답은 본문[off[2i+1]:off[2i+2]] 이다.
+# 주 형식은 여전히 questions.json 이며, 이 파일은 스냅샷의 크기와 수정 시각이 머리와 같을 때만 쓴다.
+# 같은 컴퓨터에서만 쓰는 캐시라 바이트 순서는 기계 기본값을 따르고, 내보내기에는 넣지 않는다.
+class QuestionColumns:
+    FILE, MAGIC, HEAD = "questions.bin", b"STQCOL1\n", "=8sIQqI"
+
+    def __init__(self, mm, crc, count):
+        import struct
+        self.mm, self.crc, self.count = mm, crc, count
+        start = struct.calcsize(self.HEAD)
+        self.body = start + 8 * (2 * count + 1)
+        self.offsets = memoryview(mm)[start:self.body].cast('Q')
+
+    @classmethod
+    def open(cls, path, snapshot_path):
+        import mmap, struct
+        try:
+            st = os.stat(snapshot_path)
+            with open(path, 'rb') as f: mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError): return None
+        size = struct.calcsize(cls.HEAD)
+        if len(mm) >= size:
+            magic, crc, snap_size, snap_mtime, count = struct.unpack_from(cls.HEAD, mm)
+            if magic == cls.MAGIC and (snap_size, snap_mtime) == (st.st_size, st.st_mtime_ns) and len(mm) >= size + 8 * (2 * count + 1):
+                return cls(mm, crc, count)
+        mm.close(); return None
+
+    @classmethod
+    @traced("store.columns_write")
+    def write(cls, path, items, crc, snapshot_path):
+        import struct
+        offsets, parts, pos = array('Q', [0]), [], 0
+        for it in items:
+            for text in (it['question'], it['answer']):
+                b = text.encode('utf-8'); parts.append(b); pos += len(b); offsets.append(pos)
+        st = os.stat(snapshot_path)
+        write_atomic(path, struct.pack(cls.HEAD, cls.MAGIC, crc, st.st_size, st.st_mtime_ns, len(items)) + offsets.tobytes() + b"".join(parts))
+
+    def __len__(self): return self.count
+
+    def text(self, k):
+        return self.mm[self.body + self.offsets[k]:self.body + self.offsets[k + 1]].decode('utf-8')
+
+    def item(self, i): return {"question": self.text(2 * i), "answer": self.text(2 * i + 1)}
+
+class QuestionBank(MutableSequence):
+    # 열 저장 파일 위에서 편집할 수 있는 문항 목록. 메모리에는 행 번호 배열만 두고 문항 dict 는 읽을 때 만든다.
+    # 새로 추가한 문항은 extra 에 dict 그대로 두며, 행 번호가 len(columns) 이상이면 extra 를 가리킨다.
+    def __init__(self, columns, rows=None, extra=None):
+        self.columns = columns
+        self.rows = array('q', range(len(columns))) if rows is None else rows
+        self.extra = [] if extra is None else extra
+
+    def _get(self, row):
+        n = len(self.columns)
+        return self.columns.item(row) if row < n else self.extra[row - n]
+
+    def __len__(self): return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self._get(r) for r in self.rows[i]]
+        return self._get(self.rows[i])
+
+    def __iter__(self):
+        for r in self.rows: yield self._get(r)
+
+    def __setitem__(self, i, item):
+        if isinstance(i, slice): raise TypeError("QuestionBank 는 조각 대입을 지원하지 않습니다")
+        self.extra.append(item); self.rows[i] = len(self.columns) + len(self.extra) - 1
+
+    def __delitem__(self, i): del self.rows[i]
+
+    def insert(self, i, item):
+        self.extra.append(item); self.rows.insert(i, len(self.columns) + len(self.extra) - 1)
+
+    def copy(self): return QuestionBank(self.columns, array('q', self.rows), list(self.extra))
+
+    def __add__(self, other):
+        bank = self.copy(); bank.extend(other); return bank
+
+# --- 시험 통계 로그 (stats.jsonl 추가 전용 + stats.rollup.json 요약 캐시) ---
+class StatsLog:
+    LOG, ROLLUP, LEGACY = "stats.jsonl", "stats.rollup.json", "stats.json"
+    RECENT, EMA_ALPHA = 10, 0.2
+
+    def __init__(self, folder):
+        self.log_path = os.path.join(folder, self.LOG)
+        self.rollup_path = os.path.join(folder, self.ROLLUP)
+        self.legacy_path = os.path.join(folder, self.LEGACY)
+        self.lock = folder_lock(folder)
+        self.migrate()
+
+    def migrate(self):
+        # 예전 stats.json(전체 배열)은 한 번만 줄 단위 로그로 옮긴다.
+        with self.lock:
+            if not os.path.exists(self.legacy_path): return
+            with open(self.legacy_path, 'r', encoding='utf-8') as f: stats = json.load(f)
+            old = b""
+            if os.path.exists(self.log_path):
+                with open(self.log_path, 'rb') as f: old = f.read()
+            lines = "".join(json.dumps(s, ensure_ascii=False) + "\n" for s in stats).encode('utf-8')
+            # 옮긴 뒤 stats.json 을 지우기 전에 멈췄다면 로그 앞부분이 이미 옮긴 내용이다. 다시 붙이지 않는다.
+            if not old.startswith(lines): write_atomic(self.log_path, lines + old)
+            os.remove(self.legacy_path)
+            if os.path.exists(self.rollup_path): os.remove(self.rollup_path)
+
+    def size(self): return os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+
+    @traced("stats.append")
+    def append(self, record):
+        with self.lock:
+            before = self.size()
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n"); f.flush(); os.fsync(f.fileno())
+            rollup = self._cached()
+            if rollup is not None and rollup['log_size'] == before: self._fold(rollup, record)
+            else: rollup = self._rebuild()
+            return self._store(rollup)
+
+    def records(self):
+        if not os.path.exists(self.log_path): return
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip(): yield json.loads(line)
+
+    def extend(self, records):
+        # 여러 건을 한 번에 붙이고 요약은 마지막에 한 번만 다시 만든다.
+        if not records: return
+        with self.lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                for r in records: f.write(json.dumps(r, ensure_ascii=False) + "\n")
+                f.flush(); os.fsync(f.fileno())
+            self._store(self._rebuild())
+
+    def tail(self, n):
+        # 마지막 n 건. 로그 전체를 읽지 않고 끝에서부터 줄 수가 찰 때까지만 읽는다.
+        if n <= 0 or not os.path.exists(self.log_path): return []
+        with open(self.log_path, 'rb') as f:
+            f.seek(0, os.SEEK_END); pos, buf = f.tell(), b""
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(4096, pos); pos -= step
+                f.seek(pos); buf = f.read(step) + buf
+        lines = [l for l in buf.split(b"\n") if l.strip()][-n:]
+        return [json.loads(l) for l in lines]
+
+    @classmethod
+    def _fold(cls, rollup, rec):
+        p = rec['percent']
+        rollup['count'] += 1; rollup['sum'] += p
+        rollup['best'] = p if rollup['best'] is None else max(rollup['best'], p)
+        rollup['ema'] = p if rollup['ema'] is None else round(cls.EMA_ALPHA * p + (1 - cls.EMA_ALPHA) * rollup['ema'], 2)
+        rollup['recent'] = (rollup['recent'] + [rec])[-cls.RECENT:]
+
+    @traced("stats.rollup")
+    def rollup(self):
+        # 요약은 로그 크기로 검증한다. 어긋나면(외부 편집, 비정상 종료) 로그를 한 번 훑어 다시 만든다.
+        with self.lock:
+            if not os.path.exists(self.log_path): return dict(self._rebuild(), log_size=0)
+            rollup = self._cached()
+            if rollup is not None and rollup['log_size'] == self.size(): return rollup
+            return self._store(self._rebuild())
+
+    def _cached(self):
+        if not os.path.exists(self.rollup_path): return None
+        try:
+            with open(self.rollup_path, 'r', encoding='utf-8') as f: return json.load(f)
+        except ValueError: return None
+
+    def _rebuild(self):
+        rollup = {"count": 0, "sum": 0.0, "best": None, "ema": None, "recent": []}
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip(): self._fold(rollup, json.loads(line))
+        return rollup
+
+    def _store(self, rollup):
+        rollup['log_size'] = self.size()
+        write_atomic(self.rollup_path, json.dumps(rollup, ensure_ascii=False).encode('utf-8'))
+        return rollup
+
+    def clear(self):
+        with self.lock:
+            for path in (self.log_path, self.rollup_path, self.legacy_path):
+                if os.path.exists(path): os.remove(path)
+
+# --- 오답 데이터베이스 (과목 폴더의 wrong_notes.db) ---
+# 오답노트_*.txt 는 호환용 내보내기로 계속 만들고, 예전 txt 는 처음 열 때 한 번씩 가져온다.
+NOTE_PREFIX, NOTE_RULE, NOTE_HEAD_RULE = "오답노트_", "-" * 50, "=" * 50
+
+def format_wrong_note(started, score, total, percent, wrong_records):
+    text = f"시험 일시: {started}\n결과: {score}/{total} ({percent}%)\n" + NOTE_HEAD_RULE + "\n"
+    for w in wrong_records: text += f"질문: {w['q']}\nㄴ 작성한 답: {w['user']}\nㄴ 정답: {w['correct']}\n" + NOTE_RULE + "\n"
+    return text
+
+def parse_wrong_note(text):
+    session = {"started": "", "score": 0, "total": 0, "percent": 0.0, "records": []}
+    head, _, body = text.partition(NOTE_HEAD_RULE)
+    for line in head.splitlines():
+        if line.startswith("시험 일시:"): session["started"] = line.split(":", 1)[1].strip()
+        elif line.startswith("결과:"):
+            try:
+                frac, pct = line.split(":", 1)[1].strip().split(" ", 1)
+                session["score"], session["total"] = (int(x) for x in frac.split("/"))
+                session["percent"] = float(pct.strip("()%"))
+            except ValueError: pass
+    for block in body.split(NOTE_RULE):
+        rec = {}
+        for line in block.strip().splitlines():
+            if line.startswith("질문:"): rec["q"] = line[3:].strip()
+            elif line.startswith("ㄴ 작성한 답:"): rec["user"] = line[8:].strip()
+            elif line.startswith("ㄴ 정답:"): rec["correct"] = line[5:].strip()
+        if "q" in rec: session["records"].append({"q": rec["q"], "user": rec.get("user", ""), "correct": rec.get("correct", "")})
+    return session
+
+class WrongNoteDB:
+    FILE = "wrong_notes.db"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY, started TEXT, score INTEGER, total INTEGER, percent REAL, note_file TEXT UNIQUE);
+        CREATE INDEX IF NOT EXISTS sessions_by_started ON sessions(started);
+        CREATE TABLE IF NOT EXISTS misses (id INTEGER PRIMARY KEY, session_id INTEGER NOT NULL REFERENCES sessions(id), question TEXT NOT NULL, user_answer TEXT, correct TEXT);
+        CREATE INDEX IF NOT EXISTS misses_by_session ON misses(session_id);
+        CREATE INDEX IF NOT EXISTS misses_by_question ON misses(question);
+        CREATE TABLE IF NOT EXISTS question_misses (question TEXT PRIMARY KEY, misses INTEGER NOT NULL, last_session INTEGER);
+        CREATE INDEX IF NOT EXISTS question_misses_by_count ON question_misses(misses DESC);
+        CREATE TABLE IF NOT EXISTS reviews (question TEXT PRIMARY KEY, seen INTEGER NOT NULL, misses INTEGER NOT NULL, last REAL NOT NULL, interval REAL NOT NULL);
+    """
+
+    @traced("notes.open")
+    def __init__(self, folder):
+        self.folder, self.path = folder, os.path.join(folder, self.FILE)
+        import sqlite3
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
+        self.ingest_legacy()
+
+    def close(self): self.conn.close()
+
+    def ingest_legacy(self):
+        known = {r[0] for r in self.conn.execute("SELECT note_file FROM sessions WHERE note_file IS NOT NULL")}
+        for name in sorted(os.listdir(self.folder)):
+            if name.startswith(NOTE_PREFIX) and name.endswith(".txt") and name not in known:
+                with open(os.path.join(self.folder, name), 'r', encoding='utf-8') as f: s = parse_wrong_note(f.read())
+                self.record_session(s["started"], s["score"], s["total"], s["percent"], s["records"], name)
+
+    @traced("notes.record_session")
+    def record_session(self, started, score, total, percent, wrong_records, note_file=None):
+        with self.conn:
+            sid = self.conn.execute("INSERT INTO sessions (started, score, total, percent, note_file) VALUES (?, ?, ?, ?, ?)",
+                                    (started, score, total, percent, note_file)).lastrowid
+            self.conn.executemany("INSERT INTO misses (session_id, question, user_answer, correct) VALUES (?, ?, ?, ?)",
+                                  [(sid, w['q'], w['user'], w['correct']) for w in wrong_records])
+            self.conn.executemany("INSERT INTO question_misses (question, misses, last_session) VALUES (?, 1, ?) "
+                                  "ON CONFLICT(question) DO UPDATE SET misses = misses + 1, last_session = excluded.last_session",
+                                  [(w['q'], sid) for w in wrong_records])
+        return sid
+
+    def sessions(self, offset, limit):
+        return self.conn.execute("SELECT s.id, s.started, s.score, s.total, s.percent, (SELECT COUNT(*) FROM misses m WHERE m.session_id = s.id) "
+                                 "FROM sessions s ORDER BY s.started DESC, s.id DESC LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+
+    def session_misses(self, session_id, offset, limit):
+        return self.conn.execute("SELECT question, user_answer, correct FROM misses WHERE session_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                                 (session_id, limit, offset)).fetchall()
+
+    def top_misses(self, offset, limit):
+        return self.conn.execute("SELECT question, misses FROM question_misses ORDER BY misses DESC, question LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+
+    def review_states(self):
+        return {q: {"seen": seen, "misses": misses, "last": last, "interval": interval}
+                for q, seen, misses, last, interval in self.conn.execute("SELECT question, seen, misses, last, interval FROM reviews")}
+
+    @traced("notes.record_reviews")
+    def record_reviews(self, states):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO reviews (question, seen, misses, last, interval) VALUES (?, ?, ?, ?, ?)",
+                                  [(q, st['seen'], st['misses'], st['last'], st['interval']) for q, st in states.items()])
+
+    @traced("notes.record_outcomes")
+    def record_outcomes(self, outcomes):
+        # 가중 출제가 아닌 시험의 (문제, 정답 여부, 시각) 도 같은 규칙으로 복습 상태에 반영한다.
+        with self.conn:
+            for q, correct, at in outcomes:
+                row = self.conn.execute("SELECT seen, misses, last, interval FROM reviews WHERE question = ?", (q,)).fetchone()
+                st = ReviewSampler.next_state(dict(zip(("seen", "misses", "last", "interval"), row)) if row else None, correct, at)
+                self.conn.execute("INSERT OR REPLACE INTO reviews (question, seen, misses, last, interval) VALUES (?, ?, ?, ?, ?)",
+                                  (q, st['seen'], st['misses'], st['last'], st['interval']))
+
+    def import_reviews(self, other_path):
+        # 다른 DB 의 복습 상태 중 더 최근 것만 가져온다.
+        self.conn.execute("ATTACH DATABASE ? AS src", (other_path,))
+        try:
+            with self.conn:
+                self.conn.execute("INSERT INTO reviews SELECT question, seen, misses, last, interval FROM src.reviews WHERE true "
+                                  "ON CONFLICT(question) DO UPDATE SET seen = excluded.seen, misses = excluded.misses, last = excluded.last, interval = excluded.interval "
+                                  "WHERE excluded.last > reviews.last")
+        finally: self.conn.execute("DETACH DATABASE src")
+
+    def clear(self):
+        with self.conn: self.conn.executescript("DELETE FROM misses; DELETE FROM question_misses; DELETE FROM sessions; DELETE FROM reviews;")
+
+# --- 문항 검색 색인 (과목 폴더의 search.db, 글자 2-gram 역색인) ---
+# 형태소 분석 없이도 한글 부분 검색이 되도록 공백을 뺀 소문자 문자열의 2글자 조각을 색인한다.
+# 문서 id 는 문항 목록 순서대로 증가하므로, 남아 있는 id 를 정렬하면 곧 문항 위치가 된다.
+class SearchIndex:
+    FILE = "search.db"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, question TEXT, answer TEXT, norm TEXT);
+        CREATE TABLE IF NOT EXISTS postings (gram TEXT NOT NULL, doc INTEGER NOT NULL, PRIMARY KEY (gram, doc)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, self.FILE)
+        import sqlite3
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL"); self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self): self.conn.close()
+
+    @staticmethod
+    def normalize(text): return "".join(text.lower().split())
+
+    @staticmethod
+    def grams(norm): return {norm[i:i + 2] for i in range(len(norm) - 1)} if len(norm) > 1 else {norm} - {""}
+
+    def ids(self): return [r[0] for r in self.conn.execute("SELECT id FROM docs ORDER BY id")]
+
+    # 색인이 마지막으로 맞춰진 문항 파일 서명(QuestionStore.signature). 색인을 고치는 동안에는 지워 두었다가
+    # 문항 파일 기록까지 끝난 뒤 stamp() 로 다시 남기므로, 중간에 멈추면 다음 sync 에서 다시 만든다.
+    def fresh(self, signature):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        return row is not None and json.loads(row[0]) == signature
+
+    def stamp(self, signature):
+        with self.conn: self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (json.dumps(signature),))
+
+    @traced("search.sync", items=len)
+    def sync(self, bank, signature):
+        # 서명과 개수가 맞으면 그대로 쓰고, 아니면(예전 과목, 밖에서 고친 문항, 비정상 종료) 한 번 다시 만든다.
+        ids = self.ids()
+        if len(ids) == len(bank) and self.fresh(signature): return ids
+        with self.conn: self.conn.executescript("DELETE FROM postings; DELETE FROM docs;")
+        ids = self.extend(bank, 1); self.stamp(signature)
+        return ids
+
+    @traced("search.extend", items=len)
+    def extend(self, items, first_id):
+        ids = list(range(first_id, first_id + len(items)))
+        docs = [(doc_id, it['question'], it['answer'], self.normalize(it['question'] + "\n" + it['answer'])) for doc_id, it in zip(ids, items)]
+        by_gram = {}
+        for d in docs:
+            for g in self.grams(d[3]): by_gram.setdefault(g, []).append(d[0])
+        postings = [(g, doc_id) for g in sorted(by_gram) for doc_id in by_gram[g]]  # 기본키 순서로 넣어야 대량 색인이 빠르다
+        with self.conn:
+            self.conn.execute("DELETE FROM meta WHERE key = 'signature'")
+            self.conn.executemany("INSERT INTO docs (id, question, answer, norm) VALUES (?, ?, ?, ?)", docs)
+            self.conn.executemany("INSERT OR IGNORE INTO postings (gram, doc) VALUES (?, ?)", postings)
+        return ids
+
+    def delete(self, doc_ids):
+        with self.conn:
+            self.conn.execute("DELETE FROM meta WHERE key = 'signature'")
+            for doc_id in doc_ids:
+                row = self.conn.execute("SELECT norm FROM docs WHERE id = ?", (doc_id,)).fetchone()
+                if row is None: continue
+                self.conn.executemany("DELETE FROM postings WHERE gram = ? AND doc = ?", [(g, doc_id) for g in self.grams(row[0])])
+                self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    COUNT_CAP = 20000  # 조각의 드묾을 잴 때 이보다 많으면 더 세지 않는다
+
+    @traced("search.query", items=len)
+    def query(self, text, limit=-1, after=0):
+        # 가장 드문 조각 하나의 게시 목록을 문서 번호 순으로 훑으며 실제 부분 문자열인지 확인하고, limit 개를 채우면 멈춘다.
+        # after 는 앞 페이지의 마지막 문서 번호. 흔한 조각이라도 한 페이지 분량만 읽는다.
+        norm = self.normalize(text)
+        if not norm: return []
+        if len(norm) == 1:
+            return [r[0] for r in self.conn.execute("SELECT id FROM docs WHERE id > ? AND instr(norm, ?) > 0 ORDER BY id LIMIT ?", (after, norm, limit))]
+        gram = min(sorted(self.grams(norm)), key=lambda g: self.conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE gram = ? LIMIT ?)", (g, self.COUNT_CAP)).fetchone()[0])
+        sql = ("SELECT p.doc FROM postings p JOIN docs d ON d.id = p.doc WHERE p.gram = ? AND p.doc > ? AND instr(d.norm, ?) > 0 "
+               "ORDER BY p.doc LIMIT ?")
+        return [r[0] for r in self.conn.execute(sql, (gram, after, norm, limit))]
+
+    def fetch(self, doc_ids):
+        return [self.conn.execute("SELECT question, answer FROM docs WHERE id = ?", (i,)).fetchone() for i in doc_ids]
+
+@traced("search.all_subjects", items=len)
+def search_all_subjects(base_dir, text, limit=1000):
+    results = []
+    for name in list_subjects(base_dir):
+        folder = os.path.join(base_dir, name)
+        with folder_lock(folder):
+            store, idx = QuestionStore(folder), SearchIndex(folder)
+            if not idx.fresh(store.signature()): idx.sync(store.load(), store.signature())
+            results += [(name, q, a) for q, a in idx.fetch(idx.query(text, limit - len(results)))]
+            idx.close()
+        if len(results) >= limit: break
+    return results
+
+# --- 중복 문항 검사 ---
+# 정확한 중복은 정규화한 (문제, 정답) 의 64비트 해시로 O(1) 에 거른다.
+# 비슷한 문항은 문제 글자 3-gram 의 MinHash 서명을 LSH 밴드로 묶어, 같은 버킷에 들어온 것끼리만 비교한다.
+def normalize_text(text):
+    import unicodedata
+    return " ".join(unicodedata.normalize("NFC", text).split()).lower()
+
+class DuplicateIndex:
+    @traced("dups.build")
+    def __init__(self, bank=()):
+        self.counts = Counter(self.key(it) for it in bank)
+
+    @staticmethod
+    def key(item):
+        import hashlib
+        text = normalize_text(item['question']) + "\x1f" + normalize_text(item['answer'])
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+    def __contains__(self, item): return self.counts[self.key(item)] > 0
+
+    def add(self, item):
+        key = self.key(item)
+        if self.counts[key]: return False
+        self.counts[key] = 1; return True
+
+    def copy(self):
+        dup = DuplicateIndex(); dup.counts = Counter(self.counts); return dup
+
+    def remove(self, items):
+        for it in items:
+            key = self.key(it); self.counts[key] -= 1
+            if self.counts[key] <= 0: del self.counts[key]
+
+def shingles(text, k=3):
+    norm = normalize_text(text).replace(" ", "")
+    return {norm[i:i + k] for i in range(len(norm) - k + 1)} if len(norm) >= k else {norm} - {""}
+
+def minhash_signature(shingle_set, masks):
+    # 순열 대신 64비트 해시에 무작위 마스크를 XOR 한다. 서명은 한 번의 실행 안에서만 비교하므로 hash() 로 충분하다.
+    hashes = [hash(s) & 0xFFFFFFFFFFFFFFFF for s in shingle_set]
+    return tuple(map(min, ([h ^ m for h in hashes] for m in masks)))
+
+@traced("dups.near_report", items=len)
+def near_duplicate_report(task, base_dir, threshold=0.8, num_perm=64, bands=16, seed=1):
+    rng = random.Random(seed)
+    masks = [rng.getrandbits(64) for _ in range(num_perm)]
+    rows = num_perm // bands
+    docs, buckets, subjects = [], {}, list_subjects(base_dir)
+    for si, name in enumerate(subjects):
+        if task.cancelled: return None
+        task.emit_chunk((si, len(subjects), name))
+        folder = os.path.join(base_dir, name)
+        with folder_lock(folder): bank = QuestionStore(folder).load()
+        for pos, it in enumerate(bank):
+            sh = shingles(it['question'])
+            if not sh: continue
+            sig = minhash_signature(sh, masks)
+            for b in range(bands): buckets.setdefault((b, sig[b * rows:(b + 1) * rows]), []).append(len(docs))
+            docs.append((name, pos, it['question'], it['answer']))
+    task.emit_chunk((len(subjects), len(subjects), ""))
+    # 같은 버킷의 모든 후보 쌍을 실제 자카드 유사도로 확인하고 union-find 로 묶는다.
+    # 이미 한 묶음이 된 쌍과 다른 밴드에서 이미 본 쌍은 건너뛴다.
+    parent, cache, seen = list(range(len(docs))), {}, set()
+    def find(x):
+        while parent[x] != x: parent[x] = parent[parent[x]]; x = parent[x]
+        return x
+    def sh(i):
+        if i not in cache: cache[i] = shingles(docs[i][2])
+        return cache[i]
+    for members in buckets.values():
+        for j, m in enumerate(members):
+            for o in members[:j]:
+                if (o, m) in seen or find(o) == find(m): continue
+                seen.add((o, m)); a, b = sh(o), sh(m)
+                if len(a & b) / len(a | b) >= threshold: parent[find(m)] = find(o)
+    groups = {}
+    for i in range(len(docs)): groups.setdefault(find(i), []).append(docs[i])
+    return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+def save_near_duplicate_report(task, base_dir):
+    groups = near_duplicate_report(task, base_dir)
+    if not groups: return groups, None
+    now = datetime.now()
+    lines = [f"유사 문항 보고서 ({now.strftime('%Y-%m-%d %H:%M:%S')}) - {len(groups)}개 묶음", "=" * 50]
+    for g in groups: lines += [f"[{name}] #{pos + 1} Q: {q} | A: {a}" for name, pos, q, a in g] + ["-" * 50]
+    path = os.path.join(base_dir, f"유사문항_{now.strftime('%Y%m%d_%H%M%S')}.txt")
+    with open(path, "w", encoding="utf-8") as f: f.write("\n".join(lines) + "\n")
+    return groups, path
+
+# --- 가중치 출제 (펜윅 트리 + 복습 예정 힙) ---
+class FenwickTree:
+    def __init__(self, weights):
+        self.w = list(weights); self.n = len(self.w); self.tree = [0.0] + self.w
+        for i in range(1, self.n + 1):
+            j = i + (i & -i)
+            if j <= self.n: self.tree[j] += self.tree[i]
+
+    def add(self, i, delta):
+        self.w[i] += delta; i += 1
+        while i <= self.n: self.tree[i] += delta; i += i & -i
+
+    def set(self, i, weight): self.add(i, weight - self.w[i])
+
+    def append(self, weight):
+        # 새 노드 i 는 자식 노드 i-1, i-2, i-4 ... (lowbit 미만) 의 합을 포함한다.
+        self.w.append(weight); self.n += 1; i, v, step = self.n, weight, 1
+        while step < (i & -i): v += self.tree[i - step]; step <<= 1
+        self.tree.append(v)
+
+    def total(self):
+        i, t = self.n, 0.0
+        while i > 0: t += self.tree[i]; i -= i & -i
+        return t
+
+    def find(self, x):
+        # 누적합이 x 를 처음 넘는 위치 (0부터 시작)
+        pos, mask = 0, 1 << self.n.bit_length()
+        while mask:
+            nxt = pos + mask
+            if nxt <= self.n and self.tree[nxt] <= x: x -= self.tree[nxt]; pos = nxt
+            mask >>= 1
+        return min(pos, self.n - 1)
+
+class ReviewSampler:
+    NEW_WEIGHT, OVERDUE_BOOST, MISS_WEIGHT = 2.0, 3.0, 4.0
+    FIRST_INTERVAL, GROWTH = 86400.0, 2.5
+
+    @traced("sampler.build")
+    def __init__(self, bank, states, now=None):
+        now = time.time() if now is None else now
+        # 칸은 한 번 정해지면 바뀌지 않는다. order 는 지금 목록의 위치 -> 칸, slots 는 문항 객체 -> 칸.
+        # 같은 (문제, 정답) 이 여러 번 있어도 칸이 따로 있도록 내용이 아니라 위치와 객체로 찾는다.
+        self.items, self.states, self.due = list(bank), states, []
+        self.order = list(range(len(self.items)))
+        self.slots = {id(it): i for i, it in enumerate(self.items)}
+        self.live = len(self.items)
+        self.tree = FenwickTree(self._weight(it, now) for it in self.items)
+        for i, it in enumerate(self.items): self._schedule(i, now)
+
+    def _weight(self, item, now):
+        st = self.states.get(item['question'])
+        if st is None: return self.NEW_WEIGHT
+        base = 1.0 + self.MISS_WEIGHT * st['misses'] / max(1, st['seen'])
+        return base * (self.OVERDUE_BOOST if st['last'] + st['interval'] <= now else 1.0)
+
+    def _schedule(self, slot, now):
+        st = self.states.get(self.items[slot]['question'])
+        if st is not None and st['last'] + st['interval'] > now: heapq.heappush(self.due, (st['last'] + st['interval'], slot))
+
+    def _promote_due(self, now):
+        # 복습 시점이 지난 문항만 꺼내 가중치를 올린다. 힙 항목이 낡았으면 현재 상태로 다시 계산될 뿐이다.
+        while self.due and self.due[0][0] <= now:
+            _, slot = heapq.heappop(self.due)
+            if self.tree.w[slot] > 0: self.tree.set(slot, self._weight(self.items[slot], now))
+
+    def draw(self, k, rng=random, now=None):
+        now = time.time() if now is None else now
+        self._promote_due(now)
+        picks = []
+        for _ in range(min(k, self.live)):
+            slot = self.tree.find(rng.random() * self.tree.total())
+            while self.tree.w[slot] <= 0: slot = self.tree.find(rng.random() * self.tree.total())  # 부동소수 오차로 끝 칸에 걸린 경우
+            picks.append((slot, self.tree.w[slot])); self.tree.set(slot, 0.0)
+        for slot, weight in picks: self.tree.set(slot, weight)
+        return [self.items[slot] for slot, _ in picks]
+
+    @classmethod
+    def next_state(cls, st, correct, now):
+        st = dict(st or {"seen": 0, "misses": 0, "last": now, "interval": 0.0})
+        st['seen'] += 1; st['last'] = now
+        if correct: st['interval'] = max(cls.FIRST_INTERVAL, st['interval'] * cls.GROWTH)
+        else: st['misses'] += 1; st['interval'] = 0.0
+        return st
+
+    def review(self, item, correct, now=None):
+        now = time.time() if now is None else now
+        st = self.states[item['question']] = self.next_state(self.states.get(item['question']), correct, now)
+        slot = self.slots.get(id(item))  # draw() 가 돌려준 객체
+        if slot is not None: self.tree.set(slot, self._weight(item, now)); self._schedule(slot, now)
+        return st
+
+    def add(self, item, now=None):
+        now = time.time() if now is None else now
+        slot = len(self.items); self.items.append(item); self.order.append(slot); self.slots[id(item)] = slot; self.live += 1
+        self.tree.append(self._weight(item, now)); self._schedule(slot, now)
+
+    def remove_ranges(self, ranges):
+        # 목록에서 지운 (처음, 끝) 위치 구간. 오름차순이며 끝을 포함한다.
+        for first, last in ranges:
+            for slot in self.order[first:last + 1]:
+                self.tree.set(slot, 0.0); self.slots.pop(id(self.items[slot]), None); self.live -= 1
+        for first, last in reversed(ranges): del self.order[first:last + 1]
+
+# --- 과목 카탈로그 (study_subjects/catalog.json) ---
+# 과목마다 문항 수, 시험 횟수, 마지막 시험, 최근 정답률, 폴더 크기를 모아 둔다.
+# 문항 파일(questions.json/.journal)과 통계 로그(stats.jsonl)의 (수정 시각, 크기)를 함께 적어 두고,
+# 어긋난 항목만 다시 읽는다. 쓰기 경로는 작업이 끝난 뒤 update_catalog() 로 고쳐 두고(화면의 문항 등록/삭제는 모아서 한 번),
+# 폴더 크기는 현황판을 열 때만 잰다.
+# 파일은 제자리에 덮어써서 study_subjects 의 수정 시각을 바꾸지 않는다. 그래서 그 값이 같으면
+# 과목 폴더 목록을 다시 훑지 않는다. 쓰는 도중 끊겨 깨진 파일은 버리고 새로 만든다.
+class SubjectCatalog:
+    FILE = "catalog.json"
+    QUESTION_FILES, STATS_FILES = (QuestionStore.SNAPSHOT, QuestionStore.JOURNAL), (StatsLog.LOG,)
+    lock = threading.RLock()
+
+    def __init__(self, base_dir):
+        self.base_dir, self.path = base_dir, os.path.join(base_dir, self.FILE)
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f: data = json.loads(f.read())
+            if isinstance(data.get("subjects"), dict): return data
+        except (OSError, ValueError, AttributeError): pass
+        return {"base_mtime": None, "subjects": {}}
+
+    def _write(self, data):
+        if not os.path.exists(self.path): open(self.path, 'wb').close()
+        data["base_mtime"] = os.stat(self.base_dir).st_mtime_ns
+        with open(self.path, 'r+b') as f:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')); f.truncate()
+
+    @staticmethod
+    def signature(folder, names):
+        sig = []
+        for name in names:
+            try: st = os.stat(os.path.join(folder, name)); sig.append([st.st_mtime_ns, st.st_size])
+            except OSError: sig.append(None)
+        return sig
+
+    def _names(self, data):
+        # study_subjects 가 바뀌었을 때만 폴더를 훑어 과목을 더하거나 뺀다. 새 과목은 빈 항목으로 두고 entries() 가 채운다.
+        if data["base_mtime"] == os.stat(self.base_dir).st_mtime_ns: return False
+        names = list_subjects(self.base_dir)
+        data["subjects"] = {n: data["subjects"].get(n, {}) for n in names}
+        return True
+
+    @staticmethod
+    def folder_size(folder): return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(folder) for f in files)
+
+    def _refresh(self, name, entry, count=None):
+        # 폴더 크기는 지워 두고 현황판을 열 때(entries) 잰다. 문항 수를 알려 주면 문항 수와 서명만 고친다.
+        folder = os.path.join(self.base_dir, name)
+        qsig, ssig = self.signature(folder, self.QUESTION_FILES), self.signature(folder, self.STATS_FILES)
+        entry["size"] = None
+        if count is not None: entry["count"], entry["qsig"] = count, qsig; return entry
+        if entry.get("qsig") != qsig or "count" not in entry: entry["count"] = len(QuestionStore(folder).load())
+        if entry.get("ssig") != ssig or "exams" not in entry:
+            rollup = StatsLog(folder).rollup(); recent = rollup['recent']
+            entry["exams"] = rollup['count']
+            entry["last_exam"] = recent[-1]['date'] if recent else None
+            entry["recent"] = round(sum(r['percent'] for r in recent) / len(recent), 1) if recent else None
+            ssig = self.signature(folder, self.STATS_FILES)  # 예전 stats.json 은 위에서 옮겨졌을 수 있다
+        entry["qsig"], entry["ssig"] = qsig, ssig
+        return entry
+
+    @traced("catalog.names", items=len)
+    def names(self):
+        with self.lock:
+            data = self._read()
+            if self._names(data): self._write(data)
+            return sorted(data["subjects"])
+
+    # 과목 파일은 카탈로그 잠금 밖에서 읽는다. 과목 잠금을 쥔 채 update_catalog() 를 부르는 경로(병합 등)와
+    # 잠금 순서가 엇갈려 서로 기다리지 않도록, 잠금 안에서는 catalog.json 을 읽고 쓰기만 한다.
+    @traced("catalog.entries", items=len)
+    def entries(self):
+        # 현황판용. 수정 시각이 어긋난 과목만 다시 읽으므로 과목이 많아도 대부분 stat 몇 번으로 끝난다.
+        with self.lock:
+            data = self._read()
+            if self._names(data): self._write(data)
+            seen = data["subjects"]
+        fresh = {}
+        for name, entry in seen.items():
+            folder = os.path.join(self.base_dir, name)
+            if entry.get("qsig") != self.signature(folder, self.QUESTION_FILES) or entry.get("ssig") != self.signature(folder, self.STATS_FILES):
+                entry = self._refresh(name, dict(entry))
+            if entry.get("size") is None: entry = dict(entry, size=self.folder_size(folder))
+            if entry is not seen[name]: fresh[name] = entry
+        with self.lock:
+            data = self._read(); changed = self._names(data)
+            for name, entry in fresh.items():
+                # 그 사이 다른 쓰기가 항목을 고쳤다면 그쪽을 둔다. 어긋난 값은 다음에 다시 읽는다.
+                if data["subjects"].get(name) == seen[name]: data["subjects"][name] = entry; changed = True
+            if changed: self._write(data)
+            subjects = {n: fresh.get(n, e) for n, e in data["subjects"].items()}
+        return [dict(name=n, count=e.get("count"), exams=e.get("exams"), last_exam=e.get("last_exam"), recent=e.get("recent"), size=e.get("size"))
+                for n, e in sorted(subjects.items())]
+
+    @traced("catalog.update")
+    def update(self, name, count=None):
+        if not os.path.isdir(os.path.join(self.base_dir, name)): return
+        with self.lock: entry = dict(self._read()["subjects"].get(name, {}))
+        self._refresh(name, entry, count)
+        with self.lock:
+            data = self._read(); self._names(data)
+            data["subjects"][name] = entry
+            self._write(data)
+
+    def remove(self, name):
+        with self.lock:
+            data = self._read(); data["subjects"].pop(name, None); self._names(data); self._write(data)
+
+def update_catalog(subject_path, count=None):
+    # 과목 폴더에 쓴 뒤 같은 입출력 큐에서 부른다. count 를 알면 문항 파일을 다시 읽지 않는다.
+    subject_path = os.path.abspath(subject_path)
+    SubjectCatalog(os.path.dirname(subject_path)).update(os.path.basename(subject_path), count)
+
+# --- 과목 폴더 작업 ---
+def list_subjects(base_dir):
+    if not os.path.exists(base_dir): return []
+    return sorted([d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))])
+
+def load_bank_chunks(task, store, chunk_size=5000):
+    bank = store.load()
+    if isinstance(bank, QuestionBank):
+        # 열 저장 파일로 연 목록은 통째로 넘긴다. 목록 화면은 보이는 행만 읽는다.
+        if task.cancelled: return None
+        task.emit_chunk(bank); return bank
+    for i in range(0, len(bank), chunk_size):
+        if task.cancelled: return None
+        task.emit_chunk(bank[i:i + chunk_size])
+    return bank
+
+def clear_records(subject_path):
+    StatsLog(subject_path).clear()
+    for file in os.listdir(subject_path):
+        if file.startswith(NOTE_PREFIX) and file.endswith(".txt"): os.remove(os.path.join(subject_path, file))
+    db = WrongNoteDB(subject_path); db.clear(); db.close()
+    update_catalog(subject_path)
+
+def remove_subject(subject_path):
+    import shutil
+    shutil.rmtree(subject_path)
+    subject_path = os.path.abspath(subject_path)
+    SubjectCatalog(os.path.dirname(subject_path)).remove(os.path.basename(subject_path))
+
+def add_question(subject_path, question, answer):
+    # 화면 밖(명령줄)에서 한 문항을 등록한다. 중복이면 False.
+    with folder_lock(subject_path):
+        store = QuestionStore(subject_path); bank = store.load()
+        item = {"question": question.strip(), "answer": answer.strip()}
+        if not (item['question'] and item['answer']) or item in DuplicateIndex(bank): return False
+        index = SearchIndex(subject_path); ids = index.sync(bank, store.signature())
+        store.log_add(item); index.extend([item], (ids[-1] if ids else 0) + 1)
+        if store.needs_compaction(len(bank) + 1): store.compact(bank + [item])
+        index.stamp(store.signature()); index.close()
+    update_catalog(subject_path, len(bank) + 1)
+    return True
+
+# --- 시험 진행과 채점 ---
+class Exam:
+    def __init__(self, bank, count, sampler=None, rng=random):
+        available_count = min(count, len(bank))
+        self.data = sampler.draw(available_count) if sampler else rng.sample(bank, available_count)
+        self.idx, self.score, self.wrong_records = 0, 0, []
+        # 가중 출제면 sampler 가 고친 복습 상태를, 아니면 채점 결과만 모아 두었다가 기록할 때 DB 에서 반영한다.
+        self.sampler, self.reviews, self.outcomes = sampler, {}, []
+
+    def current(self): return self.data[self.idx]
+
+    def finished(self): return self.idx >= len(self.data)
+
+    def check(self, user_ans):
+        # 현재 문항을 채점한다. 다음 문항으로 넘어가는 것은 advance() 가 따로 한다.
+        item = self.data[self.idx]
+        user_ans, correct_ans = user_ans.strip(), item['answer'].strip()
+        ok = user_ans == correct_ans
+        if ok: self.score += 1
+        else: self.wrong_records.append({"q": item['question'], "user": user_ans if user_ans else "(미입력)", "correct": correct_ans})
+        if self.sampler: self.reviews[item['question']] = self.sampler.review(item, ok)
+        else: self.outcomes.append((item['question'], ok, time.time()))
+        return ok, correct_ans
+
+    def advance(self): self.idx += 1
+
+    def stop(self):
+        # 남은 문항은 모두 오답 처리한다.
+        for i in range(self.idx, len(self.data)):
+            if not any(w['q'] == self.data[i]['question'] for w in self.wrong_records):
+                self.wrong_records.append({"q": self.data[i]['question'], "user": "(시험 중단)", "correct": self.data[i]['answer']})
+
+    def percent(self): return round((self.score / len(self.data)) * 100, 1)
+
+    def record_args(self, subject_path, now=None):
+        return (subject_path, now or datetime.now(), self.score, len(self.data), self.percent(), list(self.wrong_records), dict(self.reviews), list(self.outcomes))
+
+    def record(self, subject_path, now=None): record_exam(*self.record_args(subject_path, now))
+
+def load_review_sampler(subject_path, bank):
+    db = WrongNoteDB(subject_path)
+    try: return ReviewSampler(bank, db.review_states())
+    finally: db.close()
+
+@traced("exam.record")
+def record_exam(subject_path, now, score, total, percent, wrong_records, reviews, outcomes=()):
+    StatsLog(subject_path).append({"date": now.strftime("%Y-%m-%d %H:%M"), "score": score, "total": total, "percent": percent})
+    if reviews or outcomes:
+        db = WrongNoteDB(subject_path)
+        if reviews: db.record_reviews(reviews)
+        if outcomes: db.record_outcomes(outcomes)
+        db.close()
+    if wrong_records:
+        note_name, started, n = f"{NOTE_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}.txt", now.strftime('%Y-%m-%d %H:%M:%S'), 1
+        while os.path.exists(os.path.join(subject_path, note_name)): n += 1; note_name = f"{NOTE_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}_{n}.txt"
+        db = WrongNoteDB(subject_path); db.record_session(started, score, total, percent, wrong_records, note_name); db.close()
+        with open(os.path.join(subject_path, note_name), "w", encoding="utf-8") as f:
+            f.write(format_wrong_note(started, score, total, percent, wrong_records))
+    update_catalog(subject_path)
+
+# --- 과목 백업 (.zip) 내보내기 / 가져오기 ---
+COPY_BUFFER = 1 << 20
+# 임시 파일과 다시 만들 수 있는 캐시(열 저장 파일, 검색 색인, 통계 요약)는 내보내지 않는다.
+TRANSIENT_SUFFIXES = (".tmp", ".next", "-journal", "-wal", "-shm", QuestionColumns.FILE, SearchIndex.FILE, StatsLog.ROLLUP)
+
+def zip_arcname_ok(info):
+    import stat
+    parts = info.filename.replace("\\", "/").split("/")
+    if info.filename.startswith(("/", "\\")) or ":" in parts[0] or ".." in parts: return None
+    if stat.S_ISLNK(info.external_attr >> 16): return None
+    parts = [p for p in parts if p not in ("", ".")]
+    return parts if len(parts) >= 2 or (parts and info.is_dir()) else None
+
+def file_crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(COPY_BUFFER): crc = zlib.crc32(chunk, crc)
+    return crc
+
+def raw_copy_supported(src, dst):
+    # ZipFile 내부 속성에 기대는 방식이라, 없는 파이썬에서는 일반 복사로 돌아간다.
+    import zipfile
+    return hasattr(zipfile.ZipInfo, "FileHeader") and all(hasattr(z, a) for z in (src, dst) for a in ("fp", "filelist", "NameToInfo", "start_dir"))
+
+def copy_raw_member(src, dst, info):
+    # 압축을 풀지 않고 기존 압축 데이터를 그대로 옮긴다 (변경 없는 파일 재압축 생략).
+    import shutil, struct, zipfile
+    if not raw_copy_supported(src, dst):
+        zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+        zinfo.compress_type, zinfo.external_attr = info.compress_type, info.external_attr
+        with src.open(info) as s, dst.open(zinfo, 'w') as d: shutil.copyfileobj(s, d, COPY_BUFFER)
+        return
+    src.fp.seek(info.header_offset)
+    name_len, extra_len = struct.unpack('<HH', src.fp.read(30)[26:30])
+    src.fp.seek(info.header_offset + 30 + name_len + extra_len)
+    zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+    zinfo.compress_type, zinfo.CRC, zinfo.compress_size, zinfo.file_size = info.compress_type, info.CRC, info.compress_size, info.file_size
+    zinfo.external_attr, zinfo.flag_bits = info.external_attr, info.flag_bits & ~0x08
+    zinfo.header_offset = dst.fp.tell()
+    dst.fp.write(zinfo.FileHeader())
+    left = info.compress_size
+    while left: chunk = src.fp.read(min(COPY_BUFFER, left)); dst.fp.write(chunk); left -= len(chunk)
+    dst.filelist.append(zinfo); dst.NameToInfo[zinfo.filename] = zinfo
+    dst.start_dir = dst.fp.tell()
+
+@traced("zip.export")
+def export_subject_zip(task, subject_path, save_path, reuse=True):
+    import zipfile
+    parent = os.path.dirname(os.path.abspath(subject_path))
+    # zip 은 예전 버전과도 주고받는 형식이라 문항은 questions.json 하나로만 담는다. 저널에 남은 기록이 있거나
+    # 스냅샷이 아직 없으면 지금 목록을 새로 직렬화하고, 저널 파일은 넣지 않는다.
+    store = QuestionStore(subject_path)
+    with store.lock:
+        bank = store.load()
+        snapshot = None if store.pending == 0 and os.path.exists(store.snapshot_path) else json.dumps(list(bank), ensure_ascii=False, indent=4).encode('utf-8')
+    files = [os.path.join(root, f) for root, _, names in os.walk(subject_path) for f in names if not f.endswith(TRANSIENT_SUFFIXES)]
+    files = [path for path in files if path != store.journal_path]
+    if snapshot is not None and store.snapshot_path not in files: files.insert(0, store.snapshot_path)
+    previous = None
+    if reuse and os.path.exists(save_path):
+        try: previous = zipfile.ZipFile(save_path, 'r')
+        except zipfile.BadZipFile: previous = None
+    part = save_path + ".part"
+    try:
+        with zipfile.ZipFile(part, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for i, path in enumerate(files):
+                if task.cancelled: break
+                arcname = os.path.relpath(path, parent).replace(os.sep, "/")
+                task.emit_chunk((i, len(files), arcname))
+                old = previous.NameToInfo.get(arcname) if previous else None
+                if path == store.snapshot_path and snapshot is not None:
+                    if old and old.file_size == len(snapshot) and old.CRC == zlib.crc32(snapshot): copy_raw_member(previous, zipf, old); continue
+                    zinfo = zipfile.ZipInfo(arcname, time.localtime()[:6]); zinfo.compress_type, zinfo.external_attr = zipfile.ZIP_DEFLATED, 0o644 << 16
+                    zipf.writestr(zinfo, snapshot); continue
+                zinfo = zipfile.ZipInfo.from_file(path, arcname); zinfo.compress_type = zipfile.ZIP_DEFLATED
+                # 시각은 zip 에 2초 단위로만 남으므로 크기와 CRC 로 같은 내용인지 확인한다.
+                if old and old.file_size == zinfo.file_size and old.CRC == file_crc32(path): copy_raw_member(previous, zipf, old); continue
+                with open(path, 'rb') as src, zipf.open(zinfo, 'w') as dst:
+                    while not task.cancelled and (chunk := src.read(COPY_BUFFER)): dst.write(chunk)
+    finally:
+        if previous: previous.close()
+    if task.cancelled: os.remove(part); return None
+    os.replace(part, save_path)
+    task.emit_chunk((len(files), len(files), ""))
+    return save_path
+
+@traced("zip.stage_import")
+def stage_import_zip(task, zip_path):
+    # 모든 경로를 먼저 검사한 뒤 임시 폴더에 한 파일씩 풀어 둔다. 실제 병합은 과목별 큐에서 한다.
+    import shutil, tempfile, zipfile
+    staging = tempfile.mkdtemp(prefix="study_import_")
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            members = []
+            for info in zipf.infolist():
+                parts = zip_arcname_ok(info)
+                if parts is None: raise ValueError(f"허용되지 않는 경로가 포함되어 있습니다: {info.filename}")
+                members.append((info, parts))
+            files = [(info, parts) for info, parts in members if not info.is_dir()]
+            for i, (info, parts) in enumerate(files):
+                if task.cancelled: break
+                task.emit_chunk((i, len(files), info.filename))
+                target = os.path.join(staging, *parts)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with zipf.open(info) as src, open(target, 'wb') as dst: shutil.copyfileobj(src, dst, COPY_BUFFER)
+        if task.cancelled: shutil.rmtree(staging, ignore_errors=True); return None
+        return staging, sorted({parts[0] for _, parts in members})
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True); raise
+
+@traced("zip.merge")
+def merge_subject(src, dest):
+    # 같은 이름의 과목이 있으면 덮어쓰지 않고 문항/통계/오답/복습 기록을 합친다.
+    import shutil
+    if not os.path.exists(dest): shutil.move(src, dest); update_catalog(dest); return
+    with folder_lock(dest):
+        store = QuestionStore(dest); bank = store.load(); signature = store.signature()
+        dups = DuplicateIndex(bank)
+        new = [it for it in QuestionStore(src).load() if dups.add(it)]
+        if new:
+            store.compact(bank + new)
+            idx = SearchIndex(dest); ids = idx.sync(bank, signature); idx.extend(new, (ids[-1] if ids else 0) + 1)
+            idx.stamp(store.signature()); idx.close()
+        dest_stats = StatsLog(dest)
+        # 같은 분·같은 점수의 서로 다른 회차도 있으므로 개수까지 맞춰 이미 있는 만큼만 건너뛴다.
+        known, merged = Counter(json.dumps(r, ensure_ascii=False, sort_keys=True) for r in dest_stats.records()), []
+        for r in StatsLog(src).records():
+            key = json.dumps(r, ensure_ascii=False, sort_keys=True)
+            if known[key]: known[key] -= 1
+            else: merged.append(r)
+        dest_stats.extend(merged)
+        skip = {QuestionStore.SNAPSHOT, QuestionStore.JOURNAL, QuestionColumns.FILE, StatsLog.LOG, StatsLog.ROLLUP, StatsLog.LEGACY, WrongNoteDB.FILE, SearchIndex.FILE}
+        for name in os.listdir(src):
+            source, target = os.path.join(src, name), os.path.join(dest, name)
+            if name in skip or name.endswith(TRANSIENT_SUFFIXES) or os.path.exists(target): continue
+            if os.path.isdir(source): shutil.copytree(source, target)
+            else: shutil.copy2(source, target)
+        src_db = WrongNoteDB(src); src_db.close()
+        db = WrongNoteDB(dest); db.import_reviews(src_db.path); db.close()
+    update_catalog(dest)
+
+# --- 문항 일괄 가져오기 (CSV / TSV / JSONL) ---
+# 파일은 줄 단위로 읽고, 검증과 중복 제거를 거친 문항만 모아 마지막에 스냅샷을 한 번 쓴다.
+BULK_FIELDS = {"question": ("question", "q", "문제", "질문"), "answer": ("answer", "a", "정답", "답")}
+BULK_ERROR_LIMIT = 1000
+
+def _counted_lines(f, counter, bad):
+    # UTF-16 은 BOM 으로 알아보고 통째로 푼다. 나머지는 줄마다 UTF-8(BOM 포함) 로 먼저 풀고, 안 되면 한국어 윈도우
+    # 엑셀 기본값인 CP949 로 푼다. CP949 한글은 UTF-8 로 읽히는 일이 거의 없어 두 인코딩이 섞인 파일도 줄 단위로 맞게 읽힌다.
+    # 둘 다 안 되는 줄은 번호를 bad 에 남기고 대체 문자로 넘겨 그 행만 오류가 되게 한다.
+    import codecs
+    if f.read(2) in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        import io
+        f.seek(0)
+        for line in io.TextIOWrapper(f, encoding='utf-16', errors='replace', newline=''):
+            counter[0] += len(line) * 2
+            yield line
+        return
+    f.seek(0)
+    for i, raw in enumerate(f):
+        counter[0] += len(raw)
+        try: line = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            try: line = raw.decode('cp949')
+            except UnicodeDecodeError: line = raw.decode('utf-8', errors='replace'); bad.append(i + 1)
+        yield line.lstrip("\ufeff") if i == 0 else line
+
+def iter_question_rows(path, counter):
+    # (줄 번호, 문제, 정답, 오류) 를 하나씩 내보낸다.
+    import csv
+    ext = os.path.splitext(path)[1].lower()
+    decode_error = "글자를 읽을 수 없습니다 (UTF-8/CP949 가 아닌 줄)"
+    with open(path, 'rb') as f:
+        bad = []
+        lines = _counted_lines(f, counter, bad)
+        if ext in (".jsonl", ".ndjson"):
+            for n, line in enumerate(lines, 1):
+                if bad and bad[-1] == n: yield n, None, None, decode_error; continue
+                if not line.strip(): continue
+                try: obj = json.loads(line)
+                except ValueError: yield n, None, None, "JSON 형식 오류"; continue
+                if not isinstance(obj, dict): yield n, None, None, "객체가 아닌 줄"; continue
+                q = next((obj[k] for k in BULK_FIELDS["question"] if k in obj), None)
+                a = next((obj[k] for k in BULK_FIELDS["answer"] if k in obj), None)
+                yield n, q, a, None
+            return
+        reader = csv.reader(lines, delimiter="\t" if ext in (".tsv", ".txt") else ",")
+        cols, first, last_line = (0, 1), True, 0
+        for row in reader:
+            # 따옴표로 여러 줄에 걸친 행도 있으므로, 이번 행이 읽은 줄 가운데 깨진 줄이 있었는지 본다.
+            broken, last_line = bool(bad) and bad[-1] > last_line, reader.line_num
+            if broken: first = False; yield reader.line_num, None, None, decode_error; continue
+            if not any(c.strip() for c in row): continue
+            if first:
+                first = False
+                names = [c.strip().lower() for c in row]
+                found = [next((i for i, c in enumerate(names) if c in BULK_FIELDS[k]), None) for k in ("question", "answer")]
+                if None not in found: cols = tuple(found); continue
+            if len(row) <= max(cols): yield reader.line_num, None, None, "열 개수가 부족합니다"; continue
+            yield reader.line_num, row[cols[0]], row[cols[1]], None
+
+@traced("bulk.import")
+def bulk_import_questions(task, path, store, bank, dups, index, first_id, report_dir, batch_size=5000):
+    size, counter = max(1, os.path.getsize(path)), [0]
+    if dups is None: dups = DuplicateIndex(bank)  # 화면에서 아직 만들지 않았다면 여기서 만든다
+    new, errors = [], []
+    stats = {"rows": 0, "duplicates": 0, "error_count": 0}
+    for n, q, a, err in iter_question_rows(path, counter):
+        stats["rows"] += 1
+        if err is None and not (isinstance(q, str) and isinstance(a, str) and q.strip() and a.strip()): err = "문제 또는 정답이 비어 있습니다"
+        if err is not None:
+            stats["error_count"] += 1
+            if len(errors) < BULK_ERROR_LIMIT: errors.append((n, err))
+            continue
+        item = {"question": q.strip(), "answer": a.strip()}
+        if dups.add(item): new.append(item)
+        else: stats["duplicates"] += 1
+        if stats["rows"] % batch_size == 0:
+            if task.cancelled: return None
+            task.emit_chunk((counter[0] * 1000 // size, 1000, f"{stats['rows']}행 처리, {len(new)}개 추가"))
+    if task.cancelled: return None
+    task.emit_chunk((1000, 1000, f"{stats['rows']}행 처리, 저장 중..."))
+    if new:
+        store.compact(bank + new)
+        if index: index.extend(new, first_id); index.stamp(store.signature())
+        update_catalog(store.folder, len(bank) + len(new))
+    report = None
+    if stats["error_count"]:
+        report = os.path.join(report_dir, f"가져오기_오류_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        with open(report, "w", encoding="utf-8") as f:
+            f.write(f"{path}\n오류 {stats['error_count']}건 (최대 {BULK_ERROR_LIMIT}건 기록)\n" + "=" * 50 + "\n")
+            f.writelines(f"{n}행: {err}\n" for n, err in errors)
+    return dict(stats, added=new, dups=dups, errors=errors, report=report)
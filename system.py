@@ -1,23 +1,186 @@
 import sys
 import os
-import json
-import random
 import shutil
-import zipfile
-from datetime import datetime
+import threading
+import bisect
+import time
+from collections import deque
 
 try:
     from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                                  QLabel, QLineEdit, QPushButton, QListWidget, 
                                  QAbstractItemView, QMessageBox, QInputDialog, QFrame, 
-                                 QSpinBox, QStackedWidget, QDialog, QScrollArea, QMainWindow, 
-                                 QMenu, QFileDialog)
+                                 QSpinBox, QStackedWidget, QDialog, QMainWindow, 
+                                 QMenu, QFileDialog, QListView, QCheckBox, QProgressDialog,
+                                 QTableWidget, QTableWidgetItem, QHeaderView)
     from PyQt6.QtGui import QFont, QFontDatabase, QIcon, QAction
-    from PyQt6.QtCore import Qt, QTimer
+    from PyQt6.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QObject, QThreadPool, pyqtSignal
 except ImportError:
     print("PyQt6가 설치되지 않았습니다. 'pip install PyQt6'를 실행하세요.")
     sys.exit(1)
 
+from study_core import (QuestionStore, QuestionBank, StatsLog, WrongNoteDB, SearchIndex, DuplicateIndex, SubjectCatalog, Exam, NullTask,
+                        tracer, save_profile, update_catalog, remove_subject, load_bank_chunks, load_review_sampler, clear_records, record_exam, search_all_subjects,
+                        export_subject_zip, stage_import_zip, merge_subject, bulk_import_questions, save_near_duplicate_report)
+
+# --- 페이지 단위로 더 불러오는 목록 모델 ---
+class PagedListModel(QAbstractListModel):
+    def __init__(self, fetch, fmt, page=100, parent=None):
+        super().__init__(parent)
+        self.fetch, self.fmt, self.page = fetch, fmt, page
+        self.rows, self.done = [], False
+
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole: return None
+        return self.fmt(self.rows[index.row()])
+
+    def row_at(self, index): return self.rows[index.row()]
+
+    def canFetchMore(self, parent=QModelIndex()): return not parent.isValid() and not self.done
+
+    def fetchMore(self, parent=QModelIndex()):
+        with tracer.span("ui.page_fetch") as sp:
+            batch = self.fetch(len(self.rows), self.page)
+            self.done = len(batch) < self.page
+            if batch:
+                self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(batch) - 1)
+                self.rows.extend(batch); self.endInsertRows()
+            sp.set(items=len(batch))
+
+# --- 백그라운드 입출력 (과목 폴더별 순차 실행) ---
+# 같은 키(과목 폴더)의 작업은 제출 순서대로 하나씩, 다른 키끼리는 스레드 풀에서 동시에 실행된다.
+class TaskSignals(QObject):
+    chunk = pyqtSignal(object)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+class IOTask(NullTask):
+    def __init__(self, fn, args, with_task=False):
+        self.fn, self.args, self.with_task = fn, args, with_task
+        self.signals, self.cancelled = TaskSignals(), False
+        self.submitted = time.perf_counter()
+
+    def cancel(self): self.cancelled = True
+
+    def emit_chunk(self, data): self.signals.chunk.emit(data)
+
+    def run(self):
+        try:
+            if self.cancelled: return
+            with tracer.span("io." + getattr(self.fn, "__name__", "task"), wait_ms=round((time.perf_counter() - self.submitted) * 1000, 3)):
+                res = self.fn(self, *self.args) if self.with_task else self.fn(*self.args)
+            if not self.cancelled: self.signals.result.emit(res)
+        except Exception as e: self.signals.error.emit(f"{type(e).__name__}: {e}")
+        finally: self.signals.finished.emit()
+
+class IOQueue:
+    def __init__(self, pool=None):
+        self.pool = pool or QThreadPool.globalInstance()
+        self.lock = threading.Lock(); self.idle = threading.Condition(self.lock)
+        self.queues = {}
+
+    def submit(self, key, task):
+        with self.lock:
+            if key not in self.queues:
+                self.queues[key] = deque(); self.pool.start(lambda: self._drain(key))
+            self.queues[key].append(task)
+
+    def _drain(self, key):
+        while True:
+            with self.lock:
+                if not self.queues[key]: del self.queues[key]; self.idle.notify_all(); return
+                task = self.queues[key].popleft()
+            task.run()
+
+    def wait(self, key=None):
+        with self.lock: self.idle.wait_for(lambda: (key not in self.queues) if key is not None else not self.queues)
+
+_io_queue, _io_tasks = None, set()
+
+def submit_io(key, fn, *args, on_result=None, on_chunk=None, on_error=None, on_finished=None, with_task=False):
+    global _io_queue
+    if _io_queue is None: _io_queue = IOQueue()
+    task = IOTask(fn, args, with_task)
+    if on_result: task.signals.result.connect(on_result)
+    if on_chunk: task.signals.chunk.connect(on_chunk)
+    if on_finished: task.signals.finished.connect(on_finished)
+    task.signals.error.connect(on_error or (lambda msg: QMessageBox.warning(None, "입출력 오류", msg)))
+    # 큐에 걸린 신호가 전달될 때까지 신호 객체를 살려 둔다.
+    _io_tasks.add(task); task.signals.finished.connect(lambda: _io_tasks.discard(task))
+    _io_queue.submit(os.path.abspath(key), task)
+    return task
+
+def wait_io(key=None):
+    if _io_queue is not None: _io_queue.wait(os.path.abspath(key) if key is not None else None)
+
+# --- 문항 목록 모델 (화면에 보이는 행만 포맷) ---
+class QuestionListModel(QAbstractListModel):
+    def __init__(self, bank=None, parent=None):
+        super().__init__(parent)
+        self.bank = bank if bank is not None else []
+        self.rows = None  # 검색 중이면 보여 줄 문항 위치 목록
+        self.more = None  # 검색 결과 다음 페이지를 요청하는 함수 (없으면 끝)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid(): return 0
+        return len(self.bank) if self.rows is None else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole: return None
+        it = self.bank[self.position(index.row())]
+        return f"Q: {it['question']} | A: {it['answer']}"
+
+    def position(self, row): return row if self.rows is None else self.rows[row]
+
+    def canFetchMore(self, parent=QModelIndex()): return not parent.isValid() and self.rows is not None and self.more is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        more, self.more = self.more, None  # 결과가 오기 전까지 다시 요청하지 않는다
+        more()
+
+    def set_bank(self, bank):
+        with tracer.span("ui.list_reset", items=len(bank)):
+            self.beginResetModel(); self.bank, self.rows, self.more = bank, None, None; self.endResetModel()
+
+    def set_filter(self, rows, more=None):
+        self.beginResetModel(); self.rows, self.more = rows, more; self.endResetModel()
+
+    def extend_filter(self, rows, more=None):
+        if self.rows is None: return
+        self.more = more
+        if rows: self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1); self.rows.extend(rows); self.endInsertRows()
+
+    def extend_items(self, items):
+        if not items: return
+        with tracer.span("ui.list_extend", items=len(items)):
+            if self.rows is not None: self.bank.extend(items); return
+            row = len(self.bank)
+            self.beginInsertRows(QModelIndex(), row, row + len(items) - 1); self.bank.extend(items); self.endInsertRows()
+
+    def append_item(self, item):
+        if self.rows is not None: self.bank.append(item); return
+        row = len(self.bank)
+        self.beginInsertRows(QModelIndex(), row, row); self.bank.append(item); self.endInsertRows()
+
+    def remove_ranges(self, ranges):
+        # ranges: 문항 위치 기준 (first, last) 쌍 목록. 뒤에서부터 지워야 앞쪽 행 번호가 유지된다.
+        ranges = sorted(ranges)
+        if self.rows is None:
+            for first, last in reversed(ranges):
+                self.beginRemoveRows(QModelIndex(), first, last); del self.bank[first:last + 1]; self.endRemoveRows()
+            return
+        starts, removed, total = [r[0] for r in ranges], [], 0
+        for first, last in ranges: total += last - first + 1; removed.append(total)
+        def shifted(p):
+            i = bisect.bisect_right(starts, p) - 1
+            if i >= 0 and p <= ranges[i][1]: return None
+            return p - (removed[i] if i >= 0 else 0)
+        for first, last in reversed(ranges): del self.bank[first:last + 1]
+        self.set_filter([q for q in map(shifted, self.rows) if q is not None], self.more)
+
 # --- 오답 노트 회차 선택 및 보기 팝업 ---
 class WrongNoteDialog(QDialog):
     def __init__(self, subject_name, subject_path, parent=None):
@@ -26,58 +189,69 @@ class WrongNoteDialog(QDialog):
         self.resize(700, 800)
         self.setStyleSheet("background-color: #ede0d1;")
         self.subject_path = subject_path
+        self.db, self.closed = None, False
         
         layout = QVBoxLayout(self)
         title = QLabel(f"[{subject_name}] 회차별 오답 기록")
         title.setStyleSheet("font-size: 20px; font-weight: 500; color: #5d4037; margin-bottom: 10px;")
         layout.addWidget(title)
 
-        self.file_list = QListWidget()
+        self.file_list = QListView()
         self.file_list.setStyleSheet("background-color: white; border: none; height: 150px;")
+        self.file_list.setUniformItemSizes(True)
         self.refresh_file_list()
-        self.file_list.itemClicked.connect(self.display_note_content)
-        layout.addWidget(QLabel("복습할 회차를 선택하세요:"))
+        self.file_list.clicked.connect(self.display_note_content)
+        head_lay = QHBoxLayout()
+        head_lay.addWidget(QLabel("복습할 회차를 선택하세요:")); head_lay.addStretch()
+        btn_top = QPushButton("자주 틀리는 문항"); btn_top.setStyleSheet("background-color: #795548; color: white; padding: 6px; border: none;")
+        btn_top.clicked.connect(self.display_top_misses)
+        head_lay.addWidget(btn_top)
+        layout.addLayout(head_lay)
         layout.addWidget(self.file_list)
 
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setStyleSheet("border: 2px solid #dccdbb; background-color: white;")
-        
-        self.content_container = QWidget()
-        self.content_layout = QVBoxLayout(self.content_container)
-        self.content_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.scroll.setWidget(self.content_container)
-        layout.addWidget(self.scroll)
+        self.content_view = QListView()
+        self.content_view.setWordWrap(True)
+        self.content_view.setStyleSheet("QListView { border: 2px solid #dccdbb; background-color: white; } "
+                                        "QListView::item { padding: 15px; color: #333; border-bottom: 1px dashed #5d4037; font-size: 14px; }")
+        layout.addWidget(self.content_view)
         
         btn_close = QPushButton("닫기")
         btn_close.setStyleSheet("background-color: #5d4037; color: white; padding: 10px; border: none;")
         btn_close.clicked.connect(self.accept)
         layout.addWidget(btn_close)
 
+    def done(self, result):
+        self.closed = True
+        if self.db: self.db.close()
+        super().done(result)
+
     def refresh_file_list(self):
-        self.file_list.clear()
-        if os.path.exists(self.subject_path):
-            files = sorted([f for f in os.listdir(self.subject_path) if f.startswith("오답노트_") and f.endswith(".txt")], reverse=True)
-            self.file_list.addItems(files)
-
-    def display_note_content(self, item):
-        for i in reversed(range(self.content_layout.count())): 
-            self.content_layout.itemAt(i).widget().setParent(None)
-            
-        file_path = os.path.join(self.subject_path, item.text())
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read().split("-" * 50)
-                for block in content:
-                    if block.strip():
-                        lbl = QLabel(block.strip())
-                        lbl.setWordWrap(True)
-                        lbl.setStyleSheet("padding: 15px; color: #333; border-bottom: 1px dashed #5d4037; font-size: 14px;")
-                        self.content_layout.addWidget(lbl)
+        # DB 열기와 예전 txt 가져오기는 입출력 큐에서 하고, 이후 페이지 조회만 화면 스레드에서 한다.
+        if self.db is None: submit_io(self.subject_path, WrongNoteDB, self.subject_path, on_result=self.on_db_ready); return
+        fmt = lambda r: f"{r[1]}  |  {r[2]}/{r[3]} ({r[4]}%)  |  오답 {r[5]}개"
+        self.session_model = PagedListModel(self.db.sessions, fmt, parent=self)
+        self.file_list.setModel(self.session_model)
+
+    def on_db_ready(self, db):
+        if self.closed: db.close(); return
+        self.db = db; self.refresh_file_list()
+
+    def display_note_content(self, index):
+        sid = self.session_model.row_at(index)[0]
+        fmt = lambda r: f"질문: {r[0]}\nㄴ 작성한 답: {r[1]}\nㄴ 정답: {r[2]}"
+        self.content_view.setModel(PagedListModel(lambda off, lim: self.db.session_misses(sid, off, lim), fmt, parent=self))
+
+    def display_top_misses(self):
+        if self.db is None: return
+        self.file_list.clearSelection()
+        fmt = lambda r: f"{r[1]}회 오답  |  {r[0]}"
+        self.content_view.setModel(PagedListModel(self.db.top_misses, fmt, parent=self))
 
 # --- 메인 윈도우 ---
 class StudyMasterPyQt(QMainWindow):
-    def __init__(self):
+    SEARCH_PAGE = 500
+
+    def __init__(self, base_dir=None):
         super().__init__()
         
         if getattr(sys, 'frozen', False):
@@ -85,7 +259,7 @@ class StudyMasterPyQt(QMainWindow):
         else:
             self.current_path = os.path.dirname(os.path.abspath(__file__))
             
-        self.base_dir = os.path.join(self.current_path, "study_subjects")
+        self.base_dir = base_dir or os.path.join(self.current_path, "study_subjects")
         self.font_dir = os.path.join(self.current_path, "fonts")
         self.icon_path = os.path.join(self.current_path, "icon.ico")
         
@@ -94,15 +268,25 @@ class StudyMasterPyQt(QMainWindow):
 
         self.current_subject = None
         self.question_bank = []
+        self.store = None
+        self.sampler = None
+        self.load_task, self.load_gen, self.loading = None, 0, False
+        self.search, self.search_ready, self.doc_ids, self.search_gen = None, False, [], 0
+        self.dups, self.waiting_adds = None, None
+        self.catalog, self.catalog_counts = SubjectCatalog(self.base_dir), {}
+        self.catalog_timer = QTimer(self); self.catalog_timer.setSingleShot(True); self.catalog_timer.setInterval(2000)
+        self.catalog_timer.timeout.connect(self.flush_catalog)
+        self.profiler = None
+        self.font_family = "Malgun Gothic"
         
-        self.init_font()
         self.init_ui()
         self.init_menu()
         self.refresh_subjects()
+        # 폰트 등록은 첫 화면을 띄운 뒤로 미룬다.
+        QTimer.singleShot(0, self.init_font)
 
     def init_font(self):
         font_files = [f for f in os.listdir(self.font_dir) if f.endswith(('.ttf', '.otf'))]
-        self.font_family = "Malgun Gothic"
         if font_files:
             font_path = os.path.join(self.font_dir, font_files[0])
             font_id = QFontDatabase.addApplicationFont(font_path)
@@ -117,18 +301,51 @@ class StudyMasterPyQt(QMainWindow):
         export_action = QAction("선택 과목 내보내기 (.zip)", self)
         export_action.triggered.connect(self.export_subject)
         data_menu.addAction(export_action)
+        self.reuse_action = QAction("내보내기 시 변경된 파일만 다시 압축", self, checkable=True, checked=True)
+        data_menu.addAction(self.reuse_action)
         import_action = QAction("과목 가져오기 (.zip)", self)
         import_action.triggered.connect(self.import_subject)
         data_menu.addAction(import_action)
+        bulk_action = QAction("선택 과목에 문항 일괄 가져오기 (CSV/TSV/JSONL)", self)
+        bulk_action.triggered.connect(self.bulk_import)
+        data_menu.addAction(bulk_action)
         data_menu.addSeparator()
         reset_action = QAction("선택 과목 기록 초기화 (오답/통계)", self)
         reset_action.triggered.connect(self.reset_subject_records)
         data_menu.addAction(reset_action)
+        dashboard_action = QAction("과목 현황판 (전체 과목)", self)
+        dashboard_action.triggered.connect(self.show_dashboard)
+        data_menu.addAction(dashboard_action)
+        dup_action = QAction("유사 문항 보고서 (전체 과목)", self)
+        dup_action.triggered.connect(self.report_near_duplicates)
+        data_menu.addAction(dup_action)
+        diag_menu = menubar.addMenu("진단")
+        self.trace_action = QAction("성능 추적 기록 (Chrome trace)", self, checkable=True, checked=tracer.enabled)
+        self.trace_action.toggled.connect(self.toggle_trace)
+        diag_menu.addAction(self.trace_action)
+        self.profile_action = QAction("프로파일 시작 (cProfile)", self)
+        self.profile_action.triggered.connect(self.toggle_profile)
+        diag_menu.addAction(self.profile_action)
         help_menu = menubar.addMenu("도움말")
         about_action = QAction("프로그램 정보", self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
 
+    def toggle_trace(self, on):
+        if on: tracer.enable(); return
+        path = tracer.path; tracer.disable()
+        if path: QMessageBox.information(self, "성능 추적", f"추적 기록을 저장했습니다.\nchrome://tracing 또는 Perfetto 에서 여세요.\n{path}")
+
+    def toggle_profile(self):
+        # 화면 스레드만 잰다. 입출력 스레드에서 돈 작업은 성능 추적 기록(io.*)에서 본다.
+        import cProfile
+        if self.profiler is None:
+            self.profiler = cProfile.Profile(); self.profiler.enable()
+            self.profile_action.setText("프로파일 중지 및 저장"); return
+        profiler, self.profiler = self.profiler, None
+        profiler.disable(); self.profile_action.setText("프로파일 시작 (cProfile)")
+        QMessageBox.information(self, "프로파일", f"프로파일을 저장했습니다.\n{save_profile(profiler)}")
+
     def show_about(self):
         QMessageBox.about(self, "프로그램 정보", 
                           "모두의 스터디\n\n"
@@ -191,10 +408,22 @@ class StudyMasterPyQt(QMainWindow):
         btn_reg.clicked.connect(self.add_question)
         reg_lay.addWidget(self.ent_q); reg_lay.addWidget(self.ent_a); reg_lay.addWidget(btn_reg)
         right_side.addWidget(reg_box)
-        self.list_widget = QListWidget()
-        self.list_widget.setStyleSheet(list_style)
-        self.list_widget.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        right_side.addWidget(self.list_widget)
+        search_lay = QHBoxLayout()
+        self.ent_search = QLineEdit(); self.ent_search.setPlaceholderText("문항/정답 검색"); self.ent_search.setStyleSheet(input_style)
+        self.chk_search_all = QCheckBox("전체 과목")
+        self.search_timer = QTimer(self); self.search_timer.setSingleShot(True); self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.ent_search.textChanged.connect(self.search_timer.start); self.chk_search_all.toggled.connect(self.run_search)
+        search_lay.addWidget(self.ent_search); search_lay.addWidget(self.chk_search_all)
+        right_side.addLayout(search_lay)
+        self.search_model = QuestionListModel([], self)
+        self.list_model = QuestionListModel(self.question_bank, self)
+        self.list_view = QListView()
+        self.list_view.setStyleSheet(list_style)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.list_view.setModel(self.list_model)
+        right_side.addWidget(self.list_view)
         btn_del_q = QPushButton("선택 항목 삭제"); btn_del_q.setStyleSheet(btn_style)
         btn_del_q.clicked.connect(self.delete_selected_questions)
         right_side.addWidget(btn_del_q)
@@ -203,7 +432,9 @@ class StudyMasterPyQt(QMainWindow):
         self.spin_count = QSpinBox()
         self.spin_count.setStyleSheet("background-color: white; border: none; height: 30px;")
         self.spin_count.setRange(1, 999); self.spin_count.setValue(10)
-        set_lay.addWidget(self.spin_count); set_lay.addStretch()
+        set_lay.addWidget(self.spin_count)
+        self.chk_weighted = QCheckBox("취약·복습 문항 우선 출제")
+        set_lay.addWidget(self.chk_weighted); set_lay.addStretch()
         right_side.addLayout(set_lay)
         self.btn_exam = QPushButton("시 험 시 작")
         self.btn_exam.setStyleSheet("background-color: #d32f2f; color: white; font-size: 22px; height: 70px; border: none;")
@@ -211,10 +442,10 @@ class StudyMasterPyQt(QMainWindow):
         right_side.addWidget(self.btn_exam)
         main_layout.addLayout(right_side, 2)
 
-    def refresh_subjects(self):
-        if not os.path.exists(self.base_dir): return
-        subjects = sorted([d for d in os.listdir(self.base_dir) if os.path.isdir(os.path.join(self.base_dir, d))])
-        self.sub_list_widget.clear(); self.sub_list_widget.addItems(subjects)
+    def refresh_subjects(self): submit_io(self.base_dir, self.catalog.names, on_result=self.show_subjects)
+
+    def show_subjects(self, subjects):
+        with tracer.span("ui.subjects", items=len(subjects)): self.sub_list_widget.clear(); self.sub_list_widget.addItems(subjects)
 
     def on_subject_clicked(self, item): self.load_subject_data(item.text())
 
@@ -229,93 +460,360 @@ class StudyMasterPyQt(QMainWindow):
             folder = os.path.join(self.base_dir, name.strip())
             if not os.path.exists(folder): os.makedirs(folder); self.refresh_subjects()
 
+    def run_with_progress(self, title, key, fn, *args, on_done=None):
+        dlg = QProgressDialog(title, "취소", 0, 0, self)
+        dlg.setWindowTitle(title); dlg.setWindowModality(Qt.WindowModality.WindowModal); dlg.setAutoReset(False); dlg.setMinimumDuration(0)
+        def progress(p):
+            done, total, name = p
+            dlg.setMaximum(max(1, total)); dlg.setValue(done); dlg.setLabelText(f"{title}\n{name}")
+        def finished():
+            dlg.canceled.disconnect(); dlg.close()  # closeEvent 도 canceled 를 보내므로 먼저 끊는다
+            if task.cancelled: QMessageBox.information(self, title, "작업이 취소되었습니다.")
+        task = submit_io(key, fn, *args, with_task=True, on_chunk=progress, on_result=on_done, on_finished=finished)
+        dlg.canceled.connect(task.cancel); dlg.show()
+        return task
+
     def export_subject(self):
         if not self.current_subject: return
         save_path, _ = QFileDialog.getSaveFileName(self, "과목 내보내기", f"{self.current_subject}.zip", "Zip Files (*.zip)")
         if save_path:
-            subject_path = os.path.join(self.base_dir, self.current_subject)
-            with zipfile.ZipFile(save_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(subject_path):
-                    for file in files: zipf.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), os.path.join(subject_path, '..')))
-            QMessageBox.information(self, "성공", f"[{self.current_subject}] 과목 내보내기 완료.")
+            name, subject_path = self.current_subject, os.path.join(self.base_dir, self.current_subject)
+            self.run_with_progress("과목 내보내기", subject_path, export_subject_zip, subject_path, save_path, self.reuse_action.isChecked(),
+                                   on_done=lambda _: QMessageBox.information(self, "성공", f"[{name}] 과목 내보내기 완료."))
 
     def import_subject(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "과목 가져오기", "", "Zip Files (*.zip)")
-        if file_path:
-            with zipfile.ZipFile(file_path, 'r') as zipf: zipf.extractall(self.base_dir)
-            self.refresh_subjects(); QMessageBox.information(self, "성공", "과목을 불러왔습니다.")
+        if file_path: self.run_with_progress("과목 가져오기", self.base_dir, stage_import_zip, file_path, on_done=self.merge_imported)
+
+    def merge_imported(self, staged):
+        staging, subjects = staged
+        if not subjects: shutil.rmtree(staging, ignore_errors=True); return
+        remaining = [len(subjects)]
+        def merged():
+            remaining[0] -= 1
+            if remaining[0]: return
+            shutil.rmtree(staging, ignore_errors=True); self.refresh_subjects()
+            QMessageBox.information(self, "성공", f"과목을 불러왔습니다: {', '.join(subjects)}")
+        for name in subjects:
+            dest = os.path.join(self.base_dir, name)
+            submit_io(dest, merge_subject, os.path.join(staging, name), dest, on_finished=merged)
+        # 병합 뒤에 같은 큐로 다시 읽어 화면의 문항 목록이 병합 결과를 덮어쓰지 않게 한다.
+        if self.current_subject in subjects: self.load_subject_data(self.current_subject)
+
+    def flush_catalog(self):
+        # 등록/삭제마다 catalog.json 을 다시 쓰지 않고, 입력이 잠시 멈추거나 과목을 바꿀 때 문항 수만 한 번에 고친다.
+        self.catalog_timer.stop()
+        for path, count in self.catalog_counts.items(): submit_io(path, update_catalog, path, count)
+        self.catalog_counts.clear()
+
+    def closeEvent(self, event):
+        self.flush_catalog(); super().closeEvent(event)
+
+    def show_dashboard(self):
+        self.flush_catalog(); submit_io(self.base_dir, self.catalog.entries, on_result=self.open_dashboard)
+
+    def open_dashboard(self, entries):
+        dlg = SubjectDashboard(entries, self)
+        if dlg.exec() and dlg.chosen: self.load_subject_data(dlg.chosen)
+
+    def report_near_duplicates(self):
+        self.run_with_progress("유사 문항 검사", self.base_dir, save_near_duplicate_report, self.base_dir, on_done=self.show_duplicate_report)
+
+    def show_duplicate_report(self, res):
+        groups, path = res
+        if not groups: QMessageBox.information(self, "유사 문항 검사", "비슷한 문항이 없습니다."); return
+        QMessageBox.information(self, "유사 문항 검사", f"{len(groups)}개 묶음을 찾았습니다.\n{path}")
+
+    def bulk_import(self):
+        if not self.current_subject or self.loading: return
+        path, _ = QFileDialog.getOpenFileName(self, "문항 일괄 가져오기", "", "Question Files (*.csv *.tsv *.txt *.jsonl *.ndjson)")
+        if not path: return
+        # 가져오는 동안에는 등록/삭제를 막고, 중복 색인은 복사본을 넘겨 끝난 뒤 교체한다.
+        subject_path, gen, first_id = os.path.join(self.base_dir, self.current_subject), self.load_gen, (self.doc_ids[-1] if self.doc_ids else 0) + 1
+        self.loading = True; self.lbl_status.setText(f"선택된 과목: {self.current_subject} (가져오는 중...)")
+        task = self.run_with_progress("문항 일괄 가져오기", subject_path, bulk_import_questions, path, self.store, self.question_bank.copy(),
+                                      self.dups.copy() if self.dups is not None else None, self.search, first_id, self.base_dir, on_done=lambda res: self.finish_bulk_import(gen, first_id, res))
+        task.signals.finished.connect(lambda: self.on_load_done(gen))
+
+    def finish_bulk_import(self, gen, first_id, res):
+        if gen != self.load_gen: return
+        new = res["added"]
+        self.dups = res["dups"]; self.list_model.extend_items(new)
+        self.doc_ids.extend(range(first_id, first_id + len(new)))
+        if self.sampler:
+            for it in new: self.sampler.add(it)
+        if self.list_model.rows is not None: self.run_search()
+        msg = f"{res['rows']}행 중 {len(new)}개 추가, 중복 {res['duplicates']}개, 오류 {res['error_count']}개"
+        if res["errors"]: msg += "\n\n" + "\n".join(f"{n}행: {err}" for n, err in res["errors"][:10])
+        if res["report"]: msg += f"\n\n전체 오류 목록: {res['report']}"
+        QMessageBox.information(self, "문항 일괄 가져오기", msg)
 
     def reset_subject_records(self):
         if not self.current_subject: return
         reply = QMessageBox.question(self, '기록 초기화', f"[{self.current_subject}]의 모든 통계 및 오답 노트를 삭제하시겠습니까?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             subject_path = os.path.join(self.base_dir, self.current_subject)
-            stats_file = os.path.join(subject_path, "stats.json")
-            if os.path.exists(stats_file): os.remove(stats_file)
-            for file in os.listdir(subject_path):
-                if file.startswith("오답노트_") and file.endswith(".txt"): os.remove(os.path.join(subject_path, file))
-            QMessageBox.information(self, "완료", "기록이 초기화되었습니다.")
+            self.sampler = None
+            submit_io(subject_path, clear_records, subject_path, on_result=lambda _: QMessageBox.information(self, "완료", "기록이 초기화되었습니다."))
 
     def open_base_folder(self): os.startfile(self.base_dir)
 
     def delete_current_subject(self):
         if not self.current_subject: return
         if QMessageBox.question(self, '삭제', '영구 삭제하시겠습니까?', QMessageBox.StandardButton.Yes|QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes:
-            shutil.rmtree(os.path.join(self.base_dir, self.current_subject))
-            self.current_subject = None; self.refresh_subjects(); self.list_widget.clear()
+            if self.load_task: self.load_task.cancel()
+            subject_path = os.path.join(self.base_dir, self.current_subject)
+            self.catalog_counts.pop(subject_path, None)
+            if self.search: submit_io(subject_path, self.search.close); self.search = None
+            self.current_subject, self.store, self.sampler, self.question_bank, self.loading = None, None, None, [], False
+            self.dups, self.waiting_adds = None, None
+            self.lbl_status.setText("선택된 과목: 없음"); self.update_list_view()
+            submit_io(subject_path, remove_subject, subject_path, on_finished=self.refresh_subjects)
 
     def load_subject_data(self, name):
-        self.current_subject = name; self.lbl_status.setText(f"선택된 과목: {name}")
-        file_path = os.path.join(self.base_dir, name, "questions.json")
-        self.question_bank = []
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f: self.question_bank = json.load(f)
-        self.update_list_view(); self.spin_count.setMaximum(max(1, len(self.question_bank)))
+        # 이전 과목 로딩은 취소하고, 새 과목은 같은 과목의 쓰기가 끝난 뒤 조각 단위로 채운다.
+        if self.load_task: self.load_task.cancel()
+        self.flush_catalog()
+        self.current_subject = name; self.lbl_status.setText(f"선택된 과목: {name} (불러오는 중...)")
+        subject_path = os.path.join(self.base_dir, name)
+        if self.search: submit_io(os.path.dirname(self.search.path), self.search.close)
+        self.store, self.search, self.search_ready = QuestionStore(subject_path), None, False
+        self.question_bank, self.sampler, self.doc_ids, self.dups, self.waiting_adds, self.loading = [], None, [], None, None, True
+        self.load_gen += 1; gen = self.load_gen
+        self.update_list_view()
+        self.load_task = submit_io(subject_path, self.open_subject, subject_path, self.store, with_task=True,
+                                   on_chunk=lambda chunk: self.on_load_chunk(gen, chunk), on_result=lambda res: self.on_load_result(gen, res),
+                                   on_finished=lambda: self.on_load_done(gen))
+
+    @staticmethod
+    def open_subject(task, subject_path, store):
+        # 검색 색인 연결도 입출력 스레드에서 연다. 색인이 문항 파일과 맞지 않으면 여기서 다시 만들지 않고
+        # (과목을 바로 쓸 수 있게) 불러온 뒤 같은 큐에 따로 넣는다 (rebuild_search). 그동안 검색만 기다린다.
+        bank = load_bank_chunks(task, store)
+        if bank is None: return None
+        # 중복 색인은 모든 행을 읽어야 하므로 여기서 만들지 않고 처음 등록할 때 만든다 (build_dups).
+        index = SearchIndex(subject_path); ids = index.ids()
+        return index, (ids if len(ids) == len(bank) and index.fresh(store.signature()) else None)
+
+    @staticmethod
+    def rebuild_search(index, store, bank): index.sync(bank, store.signature())
+
+    def on_load_result(self, gen, res):
+        index, ids = res
+        if gen != self.load_gen: submit_io(os.path.dirname(index.path), index.close); return
+        self.search, self.search_ready = index, ids is not None
+        if ids is not None: self.doc_ids = ids; return
+        # 다시 만든 색인의 문서 번호는 1부터 차례대로다. 이후 등록/삭제는 같은 큐에서 이 작업 뒤에 반영된다.
+        self.doc_ids = list(range(1, len(self.question_bank) + 1))
+        submit_io(os.path.dirname(index.path), self.rebuild_search, index, self.store, self.question_bank.copy(),
+                  on_finished=lambda: self.on_search_ready(gen))
+
+    def on_search_ready(self, gen):
+        if gen != self.load_gen or not self.current_subject: return
+        self.search_ready = True
+        if not self.loading: self.lbl_status.setText(self.status_text())
+        if self.ent_search.text().strip(): self.run_search()
+
+    def status_text(self):
+        return f"선택된 과목: {self.current_subject}" + ("" if self.search_ready else " (검색 색인 준비 중...)")
+
+    def build_dups(self):
+        # 만드는 동안에는 삭제/가져오기를 막아 목록이 바뀌지 않게 하고, 그 사이 등록한 문항은 모아 두었다가 순서대로 넣는다.
+        subject_path, gen = os.path.join(self.base_dir, self.current_subject), self.load_gen
+        self.loading, self.waiting_adds = True, []
+        self.lbl_status.setText(f"선택된 과목: {self.current_subject} (중복 검사 준비 중...)")
+        submit_io(subject_path, DuplicateIndex, self.question_bank, on_result=lambda dups: self.on_dups_ready(gen, dups))
+
+    def on_dups_ready(self, gen, dups):
+        if gen != self.load_gen or not self.current_subject: return
+        waiting, self.waiting_adds, self.dups = self.waiting_adds, None, dups
+        self.on_load_done(gen)
+        for item in waiting: self.register_question(item)
+
+    def on_load_chunk(self, gen, chunk):
+        if gen != self.load_gen: return
+        if isinstance(chunk, QuestionBank): self.question_bank = chunk; self.list_model.set_bank(chunk)
+        else: self.list_model.extend_items(chunk)
+
+    def on_load_done(self, gen):
+        if gen != self.load_gen or not self.current_subject: return
+        self.loading = False; self.lbl_status.setText(self.status_text())
+        self.spin_count.setMaximum(max(1, len(self.question_bank)))
+        if self.ent_search.text().strip() and self.search_ready: self.run_search()
 
     def add_question(self):
-        if not self.current_subject: return
+        if not self.current_subject or (self.loading and self.waiting_adds is None): return
         q, a = self.ent_q.text().strip(), self.ent_a.text().strip()
         if q and a:
-            self.question_bank.append({"question": q, "answer": a}); self.save_bank()
-            self.update_list_view(); self.ent_q.clear(); self.ent_a.clear(); self.spin_count.setMaximum(len(self.question_bank))
+            item = {"question": q, "answer": a}
+            if self.dups is None:
+                if self.waiting_adds is None: self.build_dups()
+                self.waiting_adds.append(item); self.ent_q.clear(); self.ent_a.clear(); return
+            if self.register_question(item): self.ent_q.clear(); self.ent_a.clear()
+
+    def register_question(self, item):
+        if not self.dups.add(item): QMessageBox.information(self, "중복", f"이미 등록된 문항입니다: {item['question']}"); return False
+        doc_id = (self.doc_ids[-1] if self.doc_ids else 0) + 1; self.doc_ids.append(doc_id)
+        if self.search: submit_io(os.path.dirname(self.search.path), self.search.extend, [item], doc_id)
+        self.list_model.append_item(item); self.save_bank(self.store.log_add, item)
+        if self.list_model.rows is not None: self.run_search()
+        if self.sampler: self.sampler.add(item)
+        self.spin_count.setMaximum(len(self.question_bank))
+        return True
 
     def delete_selected_questions(self):
-        indices = sorted([self.list_widget.row(i) for i in self.list_widget.selectedItems()], reverse=True)
-        if indices and QMessageBox.question(self, '삭제', '삭제하시겠습니까?') == QMessageBox.StandardButton.Yes:
-            for i in indices: self.question_bank.pop(i)
-            self.save_bank(); self.update_list_view(); self.spin_count.setMaximum(max(1, len(self.question_bank)))
-
-    def save_bank(self):
-        path = os.path.join(self.base_dir, self.current_subject, "questions.json")
-        with open(path, 'w', encoding='utf-8') as f: json.dump(self.question_bank, f, ensure_ascii=False, indent=4)
-
-    def update_list_view(self):
-        self.list_widget.clear()
-        for it in self.question_bank: self.list_widget.addItem(f"Q: {it['question']} | A: {it['answer']}")
+        if self.loading or self.list_view.model() is not self.list_model: return
+        ranges = self.selected_ranges()
+        if ranges and QMessageBox.question(self, '삭제', '삭제하시겠습니까?') == QMessageBox.StandardButton.Yes:
+            if self.dups is not None: self.dups.remove([it for first, last in ranges for it in self.question_bank[first:last + 1]])
+            if self.sampler: self.sampler.remove_ranges(ranges)
+            doc_ids = [i for first, last in ranges for i in self.doc_ids[first:last + 1]]
+            for first, last in reversed(ranges): del self.doc_ids[first:last + 1]
+            if self.search: submit_io(os.path.dirname(self.search.path), self.search.delete, doc_ids)
+            self.list_view.clearSelection(); self.list_model.remove_ranges(ranges)
+            self.save_bank(self.store.log_delete, ranges); self.spin_count.setMaximum(max(1, len(self.question_bank)))
+
+    def save_bank(self, op, *args):
+        # 저널 기록과 압축은 과목별 큐에 순서대로 넣는다. 압축에는 지금 시점의 목록 복사본을 넘긴다.
+        subject_path = os.path.join(self.base_dir, self.current_subject)
+        submit_io(subject_path, op, *args)
+        if self.store.needs_compaction(len(self.question_bank)):
+            self.store.pending = 0; submit_io(subject_path, self.store.compact, self.question_bank.copy())
+        # 색인은 먼저 고쳐 두었으므로 문항 파일 기록이 끝난 뒤 서명을 남긴다.
+        if self.search: submit_io(subject_path, lambda index=self.search, store=self.store: index.stamp(store.signature()))
+        self.catalog_counts[subject_path] = len(self.question_bank); self.catalog_timer.start()
+
+    def selected_ranges(self):
+        # 선택 영역을 연속 구간 단위로 읽어 대량 선택도 행 단위 순회 없이 처리한다.
+        spans = sorted((r.top(), r.bottom()) for r in self.list_view.selectionModel().selection())
+        if self.list_model.rows is not None:
+            spans = [(p, p) for p in sorted(self.list_model.rows[r] for first, last in spans for r in range(first, last + 1))]
+        merged = []
+        for first, last in spans:
+            if merged and first <= merged[-1][1] + 1: merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+            else: merged.append((first, last))
+        return merged
+
+    def update_list_view(self): self.list_model.set_bank(self.question_bank)
+
+    def run_search(self):
+        # 입력이 멈춘 뒤 한 번만 조회하고, 늦게 도착한 이전 조회 결과는 버린다.
+        text = self.ent_search.text().strip()
+        self.search_gen += 1; gen = self.search_gen
+        if self.chk_search_all.isChecked() and text:
+            submit_io(self.base_dir, search_all_subjects, self.base_dir, text, on_result=lambda res: self.show_all_results(gen, res))
+            return
+        if self.list_view.model() is not self.list_model: self.list_view.setModel(self.list_model)
+        if not text or not self.search: self.list_model.set_filter(None); return
+        self.fetch_results(gen, text, 0)
+
+    def fetch_results(self, gen, text, after):
+        # 결과는 SEARCH_PAGE 개씩 가져오고, 목록을 끝까지 내리면 다음 페이지를 묻는다 (QuestionListModel.fetchMore).
+        submit_io(os.path.dirname(self.search.path), self.search.query, text, self.SEARCH_PAGE, after,
+                  on_result=lambda ids: self.apply_filter(gen, text, ids, append=after > 0))
+
+    def apply_filter(self, gen, text, ids, append=False):
+        if gen != self.search_gen: return
+        with tracer.span("ui.search_results", items=len(ids)):
+            rows = []
+            for doc_id in ids:
+                pos = bisect.bisect_left(self.doc_ids, doc_id)
+                if pos < len(self.doc_ids) and self.doc_ids[pos] == doc_id: rows.append(pos)
+            more = (lambda: self.fetch_results(gen, text, ids[-1])) if len(ids) == self.SEARCH_PAGE else None
+            if append: self.list_model.extend_filter(rows, more)
+            else: self.list_model.set_filter(rows, more)
+
+    def show_all_results(self, gen, results):
+        if gen != self.search_gen: return
+        with tracer.span("ui.search_results", items=len(results)): self.search_model.set_bank([{"question": f"[{name}] {q}", "answer": a} for name, q, a in results])
+        self.list_view.setModel(self.search_model)
 
     def show_statistics(self):
         if not self.current_subject: return
-        stats_path = os.path.join(self.base_dir, self.current_subject, "stats.json")
-        if not os.path.exists(stats_path):
+        subject_path = os.path.join(self.base_dir, self.current_subject)
+        submit_io(subject_path, lambda: StatsLog(subject_path).rollup(), on_result=lambda rollup, name=self.current_subject: self.display_statistics(name, rollup))
+
+    def display_statistics(self, name, rollup):
+        if not rollup['count']:
             QMessageBox.information(self, "통계", "기록이 없습니다.")
             return
-        with open(stats_path, 'r', encoding='utf-8') as f: stats = json.load(f)
-        stat_text = "\n".join([f"[{s['date']}] {s['score']}/{s['total']} ({s['percent']}%)" for s in stats[-10:]])
-        QMessageBox.information(self, f"최근 통계 - {self.current_subject}", stat_text)
+        with tracer.span("ui.statistics", items=len(rollup['recent'])):
+            recent = rollup['recent']
+            stat_text = "\n".join([f"[{s['date']}] {s['score']}/{s['total']} ({s['percent']}%)" for s in recent])
+            stat_text += (f"\n\n총 {rollup['count']}회 | 평균 {round(rollup['sum'] / rollup['count'], 1)}% | 최고 {rollup['best']}%"
+                          f"\n최근 {len(recent)}회 평균 {round(sum(s['percent'] for s in recent) / len(recent), 1)}% | 추세(EMA) {rollup['ema']}%")
+        QMessageBox.information(self, f"최근 통계 - {name}", stat_text)
+
+    def build_sampler(self):
+        # 과목당 한 번만 입출력 스레드에서 만들고, 이후에는 문항 추가/삭제와 채점 결과로 가중치를 갱신한다.
+        # 만드는 동안에는 목록이 바뀌지 않게 등록/삭제를 막고, 다 되면 시험을 시작한다.
+        subject_path, gen = os.path.join(self.base_dir, self.current_subject), self.load_gen
+        self.loading = True; self.lbl_status.setText(f"선택된 과목: {self.current_subject} (출제 준비 중...)")
+        submit_io(subject_path, load_review_sampler, subject_path, self.question_bank, on_result=lambda sampler: self.on_sampler_ready(gen, sampler))
+
+    def on_sampler_ready(self, gen, sampler):
+        if gen != self.load_gen or not self.current_subject: return
+        self.sampler = sampler; self.on_load_done(gen); self.start_exam()
 
     def start_exam(self):
-        if not self.question_bank: return
-        self.ex = ExamWindow(self.question_bank, self.font_family, self.spin_count.value(), self.current_subject, self.icon_path, self.base_dir)
+        if not self.question_bank or self.loading: return
+        if self.chk_weighted.isChecked() and self.sampler is None: self.build_sampler(); return
+        sampler = self.sampler if self.chk_weighted.isChecked() else None
+        # 가중 출제가 아닌 시험 결과는 DB 에만 반영되므로, 다음 가중 시험은 만들어 둔 sampler 대신 DB 에서 다시 만든다.
+        if sampler is None: self.sampler = None
+        self.ex = ExamWindow(self.question_bank, self.font_family, self.spin_count.value(), self.current_subject, self.icon_path, self.base_dir, sampler)
         self.ex.show()
 
+# --- 과목 현황판 ---
+class SubjectDashboard(QDialog):
+    COLUMNS = (("과목", "name"), ("문항 수", "count"), ("시험 횟수", "exams"), ("마지막 시험", "last_exam"), ("최근 정답률(%)", "recent"), ("크기(KB)", "size"))
+
+    def __init__(self, entries, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("과목 현황판")
+        self.resize(760, 600)
+        self.setStyleSheet("background-color: #ede0d1;")
+        self.chosen = None
+
+        layout = QVBoxLayout(self)
+        title = QLabel(f"전체 {len(entries)}개 과목 (제목을 누르면 정렬, 두 번 누르면 과목 열기)")
+        title.setStyleSheet("font-size: 16px; font-weight: 500; color: #5d4037; margin-bottom: 10px;")
+        layout.addWidget(title)
+
+        self.table = QTableWidget(len(entries), len(self.COLUMNS))
+        self.table.setStyleSheet("background-color: white; border: none;")
+        self.table.setHorizontalHeaderLabels([label for label, _ in self.COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        with tracer.span("ui.dashboard", items=len(entries)):
+            for row, entry in enumerate(entries):
+                for col, (_, key) in enumerate(self.COLUMNS):
+                    value = entry[key]
+                    if key == "size": value = round(value / 1024, 1)
+                    # 숫자는 숫자 그대로 넣어야 정렬이 크기 순이 된다. 기록이 없으면 빈 칸.
+                    item = QTableWidgetItem()
+                    if value is not None: item.setData(Qt.ItemDataRole.DisplayRole, value)
+                    self.table.setItem(row, col, item)
+        self.table.setSortingEnabled(True)
+        self.table.cellDoubleClicked.connect(self.choose)
+        layout.addWidget(self.table)
+
+        btn_close = QPushButton("닫기")
+        btn_close.setStyleSheet("background-color: #5d4037; color: white; padding: 10px; border: none;")
+        btn_close.clicked.connect(self.reject)
+        layout.addWidget(btn_close)
+
+    def choose(self, row, _col):
+        self.chosen = self.table.item(row, 0).text(); self.accept()
+
 # --- ExamWindow ---
 class ExamWindow(QWidget):
-    def __init__(self, data, font_name, count, sub_name, icon_path, base_dir):
+    def __init__(self, data, font_name, count, sub_name, icon_path, base_dir, sampler=None):
         super().__init__()
-        available_count = min(count, len(data))
-        self.data = random.sample(data, available_count)
+        self.exam = Exam(data, count, sampler)
         self.font_name, self.sub_name, self.icon_path, self.base_dir = font_name, sub_name, icon_path, base_dir
-        self.idx, self.score, self.wrong_records = 0, 0, []
         self.init_ui()
 
     def init_ui(self):
@@ -326,7 +824,7 @@ class ExamWindow(QWidget):
         self.stack = QStackedWidget()
         self.page_exam = QWidget()
         exam_lay = QVBoxLayout(self.page_exam)
-        self.lbl_q = QLabel(f"Q{self.idx+1}/{len(self.data)}: {self.data[0]['question']}")
+        self.lbl_q = QLabel(f"Q1/{len(self.exam.data)}: {self.exam.current()['question']}")
         self.lbl_q.setStyleSheet("font-size: 20px; padding: 20px; background-color: #262626;")
         self.lbl_q.setAlignment(Qt.AlignmentFlag.AlignCenter); self.lbl_q.setWordWrap(True)
         self.ent = QLineEdit(); self.ent.setStyleSheet("font-size: 25px; color: #ffd600; background: #333; height: 50px;")
@@ -349,47 +847,31 @@ class ExamWindow(QWidget):
         main_lay = QVBoxLayout(self); main_lay.addWidget(self.stack)
 
     def check(self):
-        user_ans = self.ent.text().strip(); correct_ans = self.data[self.idx]['answer'].strip()
-        if user_ans == correct_ans: 
-            self.score += 1; self.lbl_m.setText("정답입니다."); self.lbl_m.setStyleSheet("color: #00c853;")
-        else: 
-            self.wrong_records.append({"q": self.data[self.idx]['question'], "user": user_ans if user_ans else "(미입력)", "correct": correct_ans})
-            self.lbl_m.setText(f"오답! 정답: {correct_ans}"); self.lbl_m.setStyleSheet("color: #ff1744;")
+        ok, correct_ans = self.exam.check(self.ent.text())
+        if ok: self.lbl_m.setText("정답입니다."); self.lbl_m.setStyleSheet("color: #00c853;")
+        else: self.lbl_m.setText(f"오답! 정답: {correct_ans}"); self.lbl_m.setStyleSheet("color: #ff1744;")
         self.ent.setEnabled(False); QTimer.singleShot(1000, self.move)
 
     def move(self):
-        self.idx += 1
-        if self.idx < len(self.data):
+        self.exam.advance()
+        if not self.exam.finished():
             self.ent.setEnabled(True); self.ent.clear(); self.ent.setFocus()
-            self.lbl_q.setText(f"Q{self.idx+1}/{len(self.data)}: {self.data[self.idx]['question']}")
+            self.lbl_q.setText(f"Q{self.exam.idx+1}/{len(self.exam.data)}: {self.exam.current()['question']}")
             self.lbl_m.setText("다음 문제로..."); self.lbl_m.setStyleSheet("color: white;")
         else: self.show_result()
 
     def force_stop(self):
         reply = QMessageBox.question(self, '시험 중단', "시험을 중단하시겠습니까? 남은 문제는 모두 오답 처리됩니다.", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            for i in range(self.idx, len(self.data)):
-                if not any(w['q'] == self.data[i]['question'] for w in self.wrong_records):
-                    self.wrong_records.append({"q": self.data[i]['question'], "user": "(시험 중단)", "correct": self.data[i]['answer']})
-            self.show_result()
+            self.exam.stop(); self.show_result()
 
     def show_result(self):
-        percent = round((self.score / len(self.data)) * 100, 1)
-        self.lbl_score.setText(f"{self.score} / {len(self.data)}")
-        self.lbl_percent.setText(f"최종 성취도: {percent}%")
-        now = datetime.now().strftime("%Y%m%d_%H%M%S")
-        stats_path = os.path.join(self.base_dir, self.sub_name, "stats.json")
-        stats = []
-        if os.path.exists(stats_path):
-            with open(stats_path, 'r', encoding='utf-8') as f: stats = json.load(f)
-        stats.append({"date": datetime.now().strftime("%Y-%m-%d %H:%M"), "score": self.score, "total": len(self.data), "percent": percent})
-        with open(stats_path, 'w', encoding='utf-8') as f: json.dump(stats, f, ensure_ascii=False, indent=4)
-        if self.wrong_records:
-            note_path = os.path.join(self.base_dir, self.sub_name, f"오답노트_{now}.txt")
-            with open(note_path, "w", encoding="utf-8") as f:
-                f.write(f"시험 일시: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n결과: {self.score}/{len(self.data)} ({percent}%)\n" + "="*50 + "\n")
-                for w in self.wrong_records: f.write(f"질문: {w['q']}\nㄴ 작성한 답: {w['user']}\nㄴ 정답: {w['correct']}\n" + "-"*50 + "\n")
+        self.lbl_score.setText(f"{self.exam.score} / {len(self.exam.data)}")
+        self.lbl_percent.setText(f"최종 성취도: {self.exam.percent()}%")
+        subject_path = os.path.join(self.base_dir, self.sub_name)
+        submit_io(subject_path, record_exam, *self.exam.record_args(subject_path))
         self.stack.setCurrentIndex(1)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv); win = StudyMasterPyQt(); win.show(); sys.exit(app.exec())
\ No newline at end of file
+    app = QApplication(sys.argv); win = StudyMasterPyQt(); win.show()
+    code = app.exec(); wait_io(); sys.exit(code)
\ No newline at end of file
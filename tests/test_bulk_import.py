@@ -0,0 +1,48 @@
+import os
+
+from study_core import NullTask, QuestionStore, DuplicateIndex, iter_question_rows, bulk_import_questions
+
+def rows(tmp_path, name, data):
+    path = str(tmp_path / name)
+    with open(path, 'wb') as f: f.write(data)
+    return list(iter_question_rows(path, [0]))
+
+def test_csv_with_header_picks_columns_by_name(tmp_path):
+    data = "번호,정답,문제\n1,apple,사과\n2,sea,\"바다, 넓은\"\n".encode('utf-8')
+    assert rows(tmp_path, "q.csv", data) == [(2, "사과", "apple", None), (3, "바다, 넓은", "sea", None)]
+
+def test_tsv_without_header_uses_first_two_columns(tmp_path):
+    assert rows(tmp_path, "q.tsv", "하늘\tsky\n\n역사\thistory\n".encode('utf-8')) == [(1, "하늘", "sky", None), (3, "역사", "history", None)]
+
+def test_quoted_multiline_field(tmp_path):
+    assert rows(tmp_path, "q.csv", '"여러\n줄",답\n'.encode('utf-8')) == [(2, "여러\n줄", "답", None)]
+
+def test_short_row_is_a_row_error(tmp_path):
+    assert rows(tmp_path, "q.csv", "사과,apple\n혼자\n".encode('utf-8'))[1] == (2, None, None, "열 개수가 부족합니다")
+
+def test_jsonl_rows_and_errors(tmp_path):
+    data = '{"q": "가", "a": "나"}\n{"문제": "다", "정답": "라"}\nnot json\n[1, 2]\n'.encode('utf-8')
+    assert [(n, q, a, err is not None) for n, q, a, err in rows(tmp_path, "q.jsonl", data)] == [
+        (1, "가", "나", False), (2, "다", "라", False), (3, None, None, True), (4, None, None, True)]
+
+def test_cp949_and_bom_files_are_decoded(tmp_path):
+    assert rows(tmp_path, "cp.csv", "문제,정답\n사과,apple\n".encode('cp949')) == [(2, "사과", "apple", None)]
+    assert rows(tmp_path, "bom.csv", "﻿문제,정답\n사과,apple\n".encode('utf-8')) == [(2, "사과", "apple", None)]
+    assert rows(tmp_path, "u16.tsv", "문제\t정답\r\n사과\tapple\r\n".encode('utf-16')) == [(2, "사과", "apple", None)]
+
+def test_undecodable_line_is_a_row_error(tmp_path):
+    data = "사과,apple\n".encode('utf-8') + b"\xff\xfe\xfa,x\n" + "바다,sea\n".encode('utf-8')
+    result = rows(tmp_path, "bad.csv", data)
+    assert [r[0] for r in result] == [1, 2, 3]
+    assert result[1][3] is not None and result[2] == (3, "바다", "sea", None)
+
+def test_bulk_import_skips_duplicates_and_reports_errors(tmp_path):
+    folder = str(tmp_path / "영어"); os.makedirs(folder)
+    store = QuestionStore(folder); bank = store.load()
+    store.log_add({"question": "사과", "answer": "apple"}); bank = store.load()
+    path = str(tmp_path / "in.csv")
+    with open(path, 'wb') as f: f.write("문제,정답\n사과,apple\n바다,sea\n바다,sea\n,빈칸\n".encode('cp949'))
+    res = bulk_import_questions(NullTask(), path, store, bank, DuplicateIndex(bank), None, 1, str(tmp_path))
+    assert (res["rows"], len(res["added"]), res["duplicates"], res["error_count"]) == (4, 1, 2, 1)
+    assert [it['question'] for it in QuestionStore(folder).load()] == ["사과", "바다"]
+    assert res["report"] and os.path.exists(res["report"])
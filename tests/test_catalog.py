@@ -0,0 +1,37 @@
+import os
+import threading
+import time
+
+from study_core import SubjectCatalog, QuestionStore, folder_lock, update_catalog, add_question
+
+def test_entries_and_update_follow_subject_changes(tmp_path):
+    base = str(tmp_path)
+    for name in ("국어", "영어"): os.makedirs(os.path.join(base, name))
+    add_question(os.path.join(base, "영어"), "apple", "사과")
+    entries = {e["name"]: e for e in SubjectCatalog(base).entries()}
+    assert entries["영어"]["count"] == 1 and entries["국어"]["count"] == 0 and entries["영어"]["size"] > 0
+    store = QuestionStore(os.path.join(base, "국어")); store.load(); store.log_add({"question": "가", "answer": "나"})
+    update_catalog(os.path.join(base, "국어"), 1)
+    assert {e["name"]: e["count"] for e in SubjectCatalog(base).entries()} == {"국어": 1, "영어": 1}
+
+def test_update_under_subject_lock_does_not_deadlock_with_entries(tmp_path):
+    # 병합처럼 과목 잠금을 쥔 채 update_catalog() 를 부르는 동안 현황판이 같은 과목을 다시 읽으려는 경우.
+    base, subject = str(tmp_path), str(tmp_path / "영어")
+    os.makedirs(subject); add_question(subject, "apple", "사과")
+    catalog = SubjectCatalog(base); catalog.entries()
+    locked, result = threading.Event(), []
+
+    def writer():
+        with folder_lock(subject):
+            store = QuestionStore(subject); store.load(); store.log_add({"question": "sea", "answer": "바다"})
+            locked.set(); time.sleep(0.3)  # 그 사이 entries() 가 이 과목을 다시 읽으려고 과목 잠금을 기다린다
+            update_catalog(subject)
+
+    def reader():
+        locked.wait(); result.append(catalog.entries())
+
+    threads = [threading.Thread(target=writer, daemon=True), threading.Thread(target=reader, daemon=True)]
+    for t in threads: t.start()
+    for t in threads: t.join(5)
+    assert not any(t.is_alive() for t in threads)
+    assert result[0][0]["count"] == 2
@@ -0,0 +1,59 @@
+import os
+import shutil
+
+from study_core import QuestionStore
+
+def item(i): return {"question": f"q{i}", "answer": f"a{i}"}
+
+def texts(bank): return [it['question'] for it in bank]
+
+def make_store(folder, n=5):
+    store = QuestionStore(str(folder)); store.load()
+    for i in range(n): store.log_add(item(i))
+    return store
+
+def test_journal_replays_adds_and_deletes(tmp_path):
+    store = make_store(tmp_path)
+    store.log_delete([(1, 2)])
+    assert texts(QuestionStore(str(tmp_path)).load()) == ["q0", "q3", "q4"]
+
+def test_torn_last_line_is_skipped_and_next_append_starts_a_new_line(tmp_path):
+    store = make_store(tmp_path, 3)
+    with open(store.journal_path, 'ab') as f: f.write(b'{"add":{"quest')  # 기록 도중 끊김
+    store = QuestionStore(str(tmp_path))
+    assert texts(store.load()) == ["q0", "q1", "q2"]
+    store.log_add(item(7)); store.log_add(item(8))
+    assert texts(QuestionStore(str(tmp_path)).load()) == ["q0", "q1", "q2", "q7", "q8"]
+
+def test_bad_line_in_the_middle_does_not_stop_replay(tmp_path):
+    store = make_store(tmp_path, 2)
+    with open(store.journal_path, 'ab') as f: f.write(b'garbage\n')
+    store.log_add(item(5))
+    assert texts(QuestionStore(str(tmp_path)).load()) == ["q0", "q1", "q5"]
+
+def test_compaction_keeps_contents_and_resets_pending(tmp_path):
+    store = make_store(tmp_path, 4)
+    bank = store.load()
+    store.compact(bank)
+    assert store.pending == 0
+    store.log_add(item(9))
+    assert texts(QuestionStore(str(tmp_path)).load()) == ["q0", "q1", "q2", "q3", "q9"]
+
+def test_crash_before_journal_swap_recovers_from_next(tmp_path):
+    # 스냅샷은 바뀌었지만 questions.journal 을 .next 로 바꾸기 전에 멈춘 상태를 만든다.
+    store = make_store(tmp_path, 3)
+    old_journal = str(tmp_path / "old.journal"); shutil.copy(store.journal_path, old_journal)
+    store.compact(store.load())
+    store.log_add(item(4))
+    os.replace(store.journal_path, store.next_path); os.replace(old_journal, store.journal_path)
+    store = QuestionStore(str(tmp_path))
+    assert texts(store.load()) == ["q0", "q1", "q2", "q4"]
+    assert not os.path.exists(store.next_path)
+
+def test_journal_for_another_snapshot_is_backed_up(tmp_path):
+    store = make_store(tmp_path, 2)
+    with open(store.snapshot_path, 'w', encoding='utf-8') as f: f.write('[{"question": "x", "answer": "y"}]')
+    store = QuestionStore(str(tmp_path))
+    assert texts(store.load()) == ["x"]
+    assert not os.path.exists(store.journal_path)
+    assert os.path.exists(store.journal_path + ".orphaned")
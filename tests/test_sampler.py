@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from study_core import Exam, FenwickTree, ReviewSampler, WrongNoteDB, load_review_sampler
+
+def test_fenwick_prefix_sums_follow_updates_and_appends():
+    weights = [3.0, 1.0, 0.0, 2.0, 5.0]
+    tree = FenwickTree(weights)
+    assert tree.total() == pytest.approx(11.0)
+    tree.set(1, 4.0); tree.append(1.5); tree.append(0.5); weights[1] = 4.0; weights += [1.5, 0.5]
+    assert tree.total() == pytest.approx(sum(weights))
+    # find(x) 는 누적합이 x 를 처음 넘는 위치를 돌려준다. 가중치 0 인 칸은 고르지 않는다.
+    acc = 0.0
+    for i, w in enumerate(weights):
+        if w: assert tree.find(acc + w / 2) == i
+        acc += w
+
+def test_fenwick_draws_match_weights():
+    tree, rng, counts = FenwickTree([1.0, 0.0, 3.0]), random.Random(1), [0, 0, 0]
+    for _ in range(4000): counts[tree.find(rng.random() * tree.total())] += 1
+    assert counts[1] == 0
+    assert 2.5 < counts[2] / counts[0] < 3.5
+
+def bank(*questions): return [{"question": q, "answer": "a"} for q in questions]
+
+def test_draw_returns_distinct_live_items():
+    items = bank("a", "b", "c", "d")
+    sampler = ReviewSampler(items, {})
+    drawn = sampler.draw(10, rng=random.Random(3))
+    assert len(drawn) == 4 and {id(it) for it in drawn} == {id(it) for it in items}
+
+def test_remove_ranges_with_duplicate_items():
+    # 같은 (문제, 정답) 이 두 번 있어도 지운 위치의 문항만 빠져야 한다.
+    items = bank("dup", "dup", "x", "y")
+    sampler = ReviewSampler(items, {})
+    sampler.remove_ranges([(0, 0), (2, 2)])
+    assert sampler.live == 2
+    rng = random.Random(5)
+    seen = {id(it) for _ in range(100) for it in sampler.draw(4, rng=rng)}
+    assert seen == {id(items[1]), id(items[3])}
+
+def test_add_then_remove_by_current_position():
+    items = bank("a", "b", "c")
+    sampler = ReviewSampler(items, {})
+    sampler.remove_ranges([(0, 0)])
+    new = {"question": "n", "answer": "m"}
+    sampler.add(new)
+    sampler.remove_ranges([(2, 2)])  # 지금 목록은 b, c, n
+    assert sampler.live == 2
+    assert all(it is not new for _ in range(50) for it in sampler.draw(2))
+
+def test_removed_item_stays_out_after_review():
+    items = bank("a", "b")
+    sampler = ReviewSampler(items, {})
+    sampler.remove_ranges([(0, 0)])
+    sampler.review(items[0], False)
+    assert sampler.draw(2) == [items[1]]
+
+def test_missed_and_overdue_items_weigh_more():
+    now = 1_000_000.0
+    states = {"miss": {"seen": 2, "misses": 2, "last": now - 10, "interval": 0.0},
+              "fresh": {"seen": 3, "misses": 0, "last": now - 10, "interval": 86400.0}}
+    sampler = ReviewSampler(bank("miss", "fresh"), states, now=now)
+    assert sampler.tree.w[0] > sampler.tree.w[1]
+    # 복습 시점이 지나면 draw() 가 가중치를 올린다.
+    before = sampler.tree.w[1]
+    sampler.draw(0, now=now + 86400.0)
+    assert sampler.tree.w[1] > before
+
+def test_unweighted_exam_records_review_state(tmp_path):
+    items = bank("a", "b")
+    exam = Exam(items, 2, rng=random.Random(2))
+    for it in list(exam.data):
+        exam.check("a" if it['question'] == "a" else "x"); exam.advance()
+    exam.record(str(tmp_path))
+    db = WrongNoteDB(str(tmp_path)); states = db.review_states(); db.close()
+    assert states["a"]["seen"] == 1 and states["a"]["misses"] == 0 and states["a"]["interval"] > 0
+    assert states["b"]["seen"] == 1 and states["b"]["misses"] == 1
+    # 다음 가중 출제는 이 상태로 가중치를 매긴다.
+    sampler = load_review_sampler(str(tmp_path), items)
+    assert sampler.tree.w[1] > sampler.tree.w[0]
@@ -0,0 +1,30 @@
+from study_core import SearchIndex
+
+def make_index(folder, questions):
+    idx = SearchIndex(str(folder))
+    idx.sync([{"question": q, "answer": "a"} for q in questions], "sig")
+    return idx
+
+def brute(idx, questions, text):
+    norm = idx.normalize(text)
+    return [i + 1 for i, q in enumerate(questions) if norm in idx.normalize(q)]
+
+def test_query_matches_brute_force(tmp_path):
+    questions = [f"문항 {i} {'가나다' if i % 3 == 0 else '라마바'} {i % 7}" for i in range(300)]
+    idx = make_index(tmp_path, questions)
+    for text in ("가나다", "나다 6", "마", "문항 1", "없는말"):
+        assert idx.query(text) == brute(idx, questions, text)
+    idx.close()
+
+def test_query_pages_with_limit_and_after(tmp_path):
+    questions = [f"흔한 조각 {i}" for i in range(1000)]
+    idx = make_index(tmp_path, questions)
+    pages, after = [], 0
+    while True:
+        page = idx.query("흔한 조각", 64, after)
+        assert len(page) <= 64
+        pages += page
+        if len(page) < 64: break
+        after = page[-1]
+    assert pages == brute(idx, questions, "흔한 조각")
+    idx.close()
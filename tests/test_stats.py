@@ -0,0 +1,22 @@
+import study_cli
+from study_core import StatsLog
+
+def record(i): return {"date": f"2026-01-01 10:{i % 60:02d}", "score": i, "total": 100, "percent": float(i)}
+
+def test_tail_reads_last_records_across_blocks(tmp_path):
+    log = StatsLog(str(tmp_path))
+    records = [record(i) for i in range(300)]  # 4096 바이트 블록 여러 개
+    log.extend(records)
+    assert log.tail(1) == records[-1:]
+    assert log.tail(150) == records[-150:]
+    assert log.tail(1000) == records
+    assert log.tail(0) == [] and StatsLog(str(tmp_path / "none")).tail(5) == []
+
+def test_cli_stats_count_shows_more_than_the_rollup(tmp_path, capsys):
+    subject = tmp_path / "s"; subject.mkdir()
+    StatsLog(str(subject)).extend([record(i) for i in range(30)])
+    study_cli.main(["--base", str(tmp_path), "stats", "s", "-n", "25"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 26 and lines[0].startswith("[2026-01-01 10:05] 5/100")
+    study_cli.main(["--base", str(tmp_path), "stats", "s"])
+    assert len(capsys.readouterr().out.splitlines()) == StatsLog.RECENT + 1
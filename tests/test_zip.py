@@ -0,0 +1,105 @@
+import os
+import json
+import zipfile
+
+import pytest
+
+import study_core
+from study_core import NullTask, QuestionStore, StatsLog, add_question, export_subject_zip, stage_import_zip, merge_subject
+
+def make_subject(folder, n=200, pending=True):
+    os.makedirs(folder)
+    store = QuestionStore(folder); store.load(); store.compact([{"question": f"문항 {i}", "answer": f"답 {i}"} for i in range(n)])
+    if pending: store.log_add({"question": "추가", "answer": "답"})
+    return folder
+
+def write_zip(path, names):
+    with zipfile.ZipFile(path, 'w') as z:
+        for name in names: z.writestr(name, "x")
+
+@pytest.mark.parametrize("name", ["../evil.txt", "영어/../../evil.txt", "/abs/evil.txt", "C:/evil.txt", "영어\\..\\..\\evil.txt"])
+def test_import_rejects_path_traversal(tmp_path, name):
+    path = str(tmp_path / "bad.zip")
+    write_zip(path, ["영어/questions.json", name])
+    with pytest.raises(ValueError): stage_import_zip(NullTask(), path)
+    assert not os.path.exists(tmp_path.parent / "evil.txt")
+
+def test_import_rejects_symlinks(tmp_path):
+    path = str(tmp_path / "link.zip")
+    info = zipfile.ZipInfo("영어/link"); info.external_attr = (0o120777 << 16)
+    with zipfile.ZipFile(path, 'w') as z: z.writestr(info, "/etc/passwd")
+    with pytest.raises(ValueError): stage_import_zip(NullTask(), path)
+
+def test_export_then_import_round_trip(tmp_path):
+    subject = make_subject(str(tmp_path / "base" / "영어"))
+    out = str(tmp_path / "영어.zip")
+    export_subject_zip(NullTask(), subject, out)
+    staging, names = stage_import_zip(NullTask(), out)
+    assert names == ["영어"]
+    assert QuestionStore(os.path.join(staging, "영어")).load() == QuestionStore(subject).load()
+
+def test_export_leaves_out_rebuildable_caches(tmp_path):
+    subject = make_subject(str(tmp_path / "영어"))
+    add_question(subject, "검색", "색인")  # search.db 를 만든다
+    StatsLog(subject).extend([{"date": "2026-01-01 10:00", "score": 1, "total": 2, "percent": 50.0}]); StatsLog(subject).rollup()
+    assert {"search.db", "stats.rollup.json"} <= set(os.listdir(subject))
+    out = str(tmp_path / "out.zip")
+    export_subject_zip(NullTask(), subject, out)
+    with zipfile.ZipFile(out) as z: assert sorted(z.namelist()) == ["영어/questions.json", "영어/stats.jsonl"]
+
+def test_reexport_reuses_unchanged_members_raw(tmp_path, monkeypatch):
+    subject = make_subject(str(tmp_path / "영어"))
+    with open(os.path.join(subject, "memo.txt"), 'w', encoding='utf-8') as f: f.write("메모")
+    out = str(tmp_path / "out.zip")
+    export_subject_zip(NullTask(), subject, out)
+    copied, raw = [], study_core.copy_raw_member
+    monkeypatch.setattr(study_core, "copy_raw_member", lambda src, dst, info: (copied.append(info.filename), raw(src, dst, info)))
+    export_subject_zip(NullTask(), subject, out)
+    assert sorted(copied) == ["영어/memo.txt", "영어/questions.json"]
+    # 저널에 기록이 늘면 새로 직렬화한 questions.json 은 다시 압축하고, 그대로인 파일만 압축 데이터를 옮긴다.
+    copied.clear(); QuestionStore(subject).log_add({"question": "b", "answer": "c"})
+    export_subject_zip(NullTask(), subject, out)
+    assert copied == ["영어/memo.txt"]
+    with zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        assert json.loads(z.read("영어/questions.json")) == QuestionStore(subject).load()
+
+def test_export_writes_journal_entries_into_questions_json(tmp_path):
+    # 저널만 있는 과목도 예전 버전이 읽는 questions.json 하나로 내보낸다.
+    subject = str(tmp_path / "수학"); os.makedirs(subject)
+    for i in range(3): add_question(subject, f"문제 {i}", f"답 {i}")
+    out = str(tmp_path / "수학.zip")
+    export_subject_zip(NullTask(), subject, out)
+    with zipfile.ZipFile(out) as z:
+        assert "수학/questions.journal" not in z.namelist()
+        assert [it['question'] for it in json.loads(z.read("수학/questions.json"))] == ["문제 0", "문제 1", "문제 2"]
+
+def test_same_size_edit_is_not_reused(tmp_path):
+    subject = make_subject(str(tmp_path / "영어"), pending=False)
+    out = str(tmp_path / "out.zip")
+    export_subject_zip(NullTask(), subject, out)
+    path = os.path.join(subject, "questions.json")
+    with open(path, 'rb') as f: data = bytearray(f.read())
+    data[data.index("문항 1".encode()) + len("문항 ".encode())] = ord("7")  # 같은 크기로 한 글자를 바꾼다
+    stat = os.stat(path)
+    with open(path, 'wb') as f: f.write(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    export_subject_zip(NullTask(), subject, out)
+    with zipfile.ZipFile(out) as z: assert z.read("영어/questions.json") == bytes(data)
+
+def test_raw_copy_falls_back_without_zipfile_internals(tmp_path, monkeypatch):
+    subject = make_subject(str(tmp_path / "영어"))
+    out = str(tmp_path / "out.zip")
+    export_subject_zip(NullTask(), subject, out)
+    monkeypatch.setattr(study_core, "raw_copy_supported", lambda src, dst: False)
+    export_subject_zip(NullTask(), subject, out)
+    with zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        assert json.loads(z.read("영어/questions.json")) == QuestionStore(subject).load()
+
+def test_merge_keeps_repeated_identical_sessions(tmp_path):
+    dest, src = make_subject(str(tmp_path / "a" / "영어")), make_subject(str(tmp_path / "b" / "영어"))
+    record = {"date": "2026-01-01 10:00", "score": 1, "total": 2, "percent": 50.0}
+    StatsLog(dest).extend([record]); StatsLog(src).extend([record, record])
+    merge_subject(src, dest)
+    assert list(StatsLog(dest).records()) == [record, record]